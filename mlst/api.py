@@ -1,39 +1,271 @@
-from fastapi import FastAPI
-from ingest import load_data
-from preprocess import preprocess
-from forecast import train_forecast
-from personas import create_personas
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from typing import List, Optional
+from artifacts import artifact_key, dataset_version, load_or_build, manifest_entry, update_manifest
+from forecast import predict_forecast
 from recommend import recommend_events
+from ingest import load_dataset
+from backend import booking_impact
+from impact import impact_window
+from metrics import exposition, observe_request
+from profiling import profile_request, profile_requested, profile_summary
+from collections import OrderedDict, deque
+from datetime import date
+import eda
+import hashlib
+import json
 import pandas as pd
+import threading
+import time
 import config
 
 app = FastAPI()
 
-bookings, events, weather = load_data()
-if len(bookings) == 0 or len(events) == 0:
-    raise FileNotFoundError("No datasets available. Please generate datasets first.")
+def build_state(manifest):
+    if not manifest_entry(manifest, 'bookings.csv') or not manifest_entry(manifest, 'events.csv'):
+        raise FileNotFoundError("No datasets available. Please generate datasets first.")
+    
+    return {
+        'manifest': manifest,
+        'version': dataset_version(manifest),
+        'df': load_or_build('daily', manifest),
+        'bookings': load_dataset('bookings', config.BOOKINGS_ANALYTICS_COLUMNS, compact=True),
+        'personas': load_or_build('personas', manifest),
+        'ranker': load_or_build('ranker', manifest),
+        'cube': load_or_build('cube', manifest),
+        'occupancy': load_or_build('occupancy', manifest),
+        'forecast_models': {
+            'demand': load_or_build('forecast_demand', manifest),
+            'revpar': load_or_build('forecast_revpar', manifest),
+            'occupancy': load_or_build('forecast_occupancy', manifest)
+        },
+        'responses': OrderedDict(),
+        'impressions': deque()
+    }
+
+state = build_state(update_manifest())
+reload_lock = threading.Lock()
+responses_lock = threading.Lock()
+impressions_lock = threading.Lock()
+
+def carry_impressions(old, new):
+    if artifact_key('ranker', new['manifest']) == artifact_key('ranker', old['manifest']):
+        new['ranker'] = old['ranker']
+    else:
+        for impressions in old['impressions']:
+            new['ranker'].partial_fit(impressions)
+    new['impressions'] = old['impressions']
+
+def reload_state(force=False):
+    global state
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        manifest = update_manifest()
+        if not force and manifest == state['manifest']:
+            return False
+        new_state = build_state(manifest)
+        with impressions_lock:
+            carry_impressions(state, new_state)
+            state = new_state
+        print(f"Reloaded datasets, version {state['version']}, replayable impressions {sum(len(frame) for frame in state['impressions'])}")
+        return True
+    except Exception as e:
+        print(f"Dataset reload failed, keeping version {state['version']}: {e}")
+        return False
+    finally:
+        reload_lock.release()
+
+def watch_datasets():
+    pending = None
+    while True:
+        time.sleep(config.RELOAD_POLL_SECONDS)
+        manifest = update_manifest()
+        if manifest == state['manifest']:
+            pending = None
+        elif manifest == pending:
+            reload_state()
+        else:
+            pending = manifest
+
+if config.RELOAD_POLL_SECONDS > 0:
+    threading.Thread(target=watch_datasets, daemon=True).start()
+
+class Impression(BaseModel):
+    guest_id: int
+    event_id: int
+    date_shown: date
+    clicked: int
+    converted: int = 0
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        endpoint = route.path if route is not None else 'unmatched'
+        observe_request(request.method, endpoint, status, time.perf_counter() - start)
 
-df = preprocess(bookings, events, weather)
-personas = create_personas(bookings)
+@app.middleware("http")
+async def profile_flagged(request: Request, call_next):
+    if profile_requested(request):
+        return await profile_request(request, call_next)
+    return await call_next(request)
+
+@app.get("/metrics")
+def get_metrics():
+    body, content_type = exposition()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/forecast/demand")
 def forecast_demand(periods: int = config.DEFAULT_FORECAST_PERIODS):
-    _, forecast = train_forecast(df, target='demand', periods=periods)
+    snapshot = state
+    forecast = predict_forecast(snapshot['forecast_models']['demand'], snapshot['df'], target='demand', periods=periods)
     return forecast[['ds', 'yhat']].tail(periods).to_dict('records')
 
 @app.get("/forecast/revpar")
 def forecast_revpar(periods: int = config.DEFAULT_FORECAST_PERIODS):
-    _, forecast = train_forecast(df, target='revpar', periods=periods)
+    snapshot = state
+    forecast = predict_forecast(snapshot['forecast_models']['revpar'], snapshot['df'], target='revpar', periods=periods)
+    return forecast[['ds', 'yhat']].tail(periods).to_dict('records')
+
+@app.get("/forecast/occupancy")
+def forecast_occupancy(periods: int = config.DEFAULT_FORECAST_PERIODS):
+    snapshot = state
+    forecast = predict_forecast(snapshot['forecast_models']['occupancy'], snapshot['df'], target='occupancy', periods=periods)
     return forecast[['ds', 'yhat']].tail(periods).to_dict('records')
 
+@app.get("/occupancy")
+def get_occupancy(start_date: date, end_date: date, accommodation_id: Optional[int] = None):
+    calendar = state['occupancy']
+    calendar = calendar[(calendar['date'] >= pd.Timestamp(start_date)) & (calendar['date'] <= pd.Timestamp(end_date))]
+    if accommodation_id is not None:
+        calendar = calendar[calendar['accommodation_id'] == accommodation_id]
+    return calendar.to_dict('records')
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
+def versioned_response(request, name, compute, **params):
+    snapshot = state
+    key = json.dumps([name, sorted(params.items())], default=str)
+    etag = '"' + hashlib.sha256(f"{snapshot['version']}|{key}".encode()).hexdigest()[:32] + '"'
+    headers = {'ETag': etag, 'Cache-Control': f"public, max-age={config.EDA_CACHE_MAX_AGE}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    responses = snapshot['responses']
+    with responses_lock:
+        body = responses.get(key)
+        if body is not None:
+            responses.move_to_end(key)
+    if body is None:
+        result = compute(snapshot)
+        if isinstance(result, pd.DataFrame):
+            result = result.to_dict('records')
+        body = json.dumps(jsonable_encoder(result)).encode()
+        with responses_lock:
+            responses[key] = body
+            while len(responses) > config.RESPONSE_CACHE_ENTRIES:
+                responses.popitem(last=False)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+@app.get("/eda/daily")
+def eda_daily(request: Request):
+    return versioned_response(request, 'daily', lambda snapshot: eda.daily_series(snapshot['df']))
+
+@app.get("/eda/demand")
+def eda_demand(request: Request):
+    return versioned_response(request, 'demand', lambda snapshot: eda.demand_over_time(snapshot['df']))
+
+@app.get("/eda/monthly")
+def eda_monthly(request: Request):
+    return versioned_response(request, 'monthly', lambda snapshot: eda.monthly_demand(snapshot['df']))
+
+@app.get("/eda/revpar-histogram")
+def eda_revpar_histogram(request: Request, bins: int = Query(40, ge=1, le=500)):
+    return versioned_response(request, 'revpar_histogram', lambda snapshot: eda.revpar_histogram(snapshot['df'], bins), bins=bins)
+
+@app.get("/eda/temperature")
+def eda_temperature(request: Request):
+    return versioned_response(request, 'temperature', lambda snapshot: eda.temperature_demand(snapshot['df']))
+
+@app.get("/eda/event-intensity")
+def eda_event_intensity(request: Request):
+    return versioned_response(request, 'event_intensity', lambda snapshot: eda.demand_by_event_intensity(snapshot['df']))
+
+@app.get("/eda/segments")
+def eda_segments(request: Request, by: str = Query('type', pattern='^(type|stars|guest_country|year|month|weekday|year_month)$'),
+                 stars: List[int] = Query(None), start_date: Optional[date] = None, end_date: Optional[date] = None):
+    return versioned_response(
+        request, 'segments',
+        lambda snapshot: eda.segment_breakdown(snapshot['cube'], by, stars=stars, start_date=start_date, end_date=end_date),
+        by=by, stars=stars, start_date=start_date, end_date=end_date
+    )
+
+def sample_impact(snapshot):
+    start_date, end_date = impact_window(snapshot['df'])
+    sample_recs = recommend_events(1, config.DEFAULT_RECOMMENDATIONS * 2, start_date, end_date, ranker=snapshot['ranker'], bookings=snapshot['bookings'], personas=snapshot['personas'])
+    return booking_impact(snapshot['bookings'], sample_recs)
+
+@app.get("/impact")
+def get_impact(request: Request):
+    return versioned_response(request, 'impact', sample_impact)
+
 @app.get("/recommend/{guest_id}")
-def recommend(guest_id: int, n: int = config.DEFAULT_RECOMMENDATIONS):
-    recs = recommend_events(guest_id, n)
-    return recs[['event_id', 'date', 'type', 'name', 'location']].to_dict('records')
+def recommend(guest_id: int, n: int = config.DEFAULT_RECOMMENDATIONS, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    snapshot = state
+    recs = recommend_events(guest_id, n, start_date, end_date, ranker=snapshot['ranker'], bookings=snapshot['bookings'], personas=snapshot['personas'])
+    if len(recs) == 0:
+        return []
+    return recs[['event_id', 'date', 'type', 'name', 'location', 'expected_attendance']].to_dict('records')
+
+@app.post("/impressions")
+def record_impressions(impressions: List[Impression]):
+    if len(impressions) == 0:
+        return {"received": 0, "total_impressions": state['ranker'].n_impressions}
+    
+    frame = pd.DataFrame([impression.model_dump() for impression in impressions])
+    with impressions_lock:
+        snapshot = state
+        snapshot['ranker'].partial_fit(frame)
+        log = snapshot['impressions']
+        log.append(frame)
+        rows = sum(len(logged) for logged in log)
+        while rows > config.IMPRESSION_LOG_ROWS and len(log) > 1:
+            rows -= len(log.popleft())
+    return {"received": len(impressions), "total_impressions": snapshot['ranker'].n_impressions}
+
+@app.post("/admin/reload", status_code=202)
+def reload_datasets(force: bool = False):
+    if reload_lock.locked():
+        return {"status": "already reloading", "version": state['version']}
+    threading.Thread(target=reload_state, args=(force,), daemon=True).start()
+    return {"status": "reloading", "version": state['version']}
+
+@app.get("/admin/version")
+def get_version():
+    return {"version": state['version'], "reloading": reload_lock.locked()}
+
+@app.get("/admin/profiles")
+def get_profiles(endpoint: Optional[str] = None, top: int = Query(config.PROFILE_TOP, ge=1)):
+    return profile_summary(endpoint, top)
 
 @app.get("/itinerary/{guest_id}")
-def get_itinerary(guest_id: int, days: int = config.DEFAULT_ITINERARY_DAYS, n_per_day: int = config.DEFAULT_EVENTS_PER_DAY):
-    recs = recommend_events(guest_id, n=days * n_per_day)
+def get_itinerary(guest_id: int, days: int = config.DEFAULT_ITINERARY_DAYS, n_per_day: int = config.DEFAULT_EVENTS_PER_DAY,
+                  start_date: Optional[date] = None, end_date: Optional[date] = None):
+    snapshot = state
+    recs = recommend_events(guest_id, n=days * n_per_day, start_date=start_date, end_date=end_date, ranker=snapshot['ranker'], bookings=snapshot['bookings'], personas=snapshot['personas'])
     
     if len(recs) == 0:
         return {"itinerary": []}
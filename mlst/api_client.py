@@ -0,0 +1,43 @@
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import config
+
+class ApiClient:
+    def __init__(self, base_url=config.API_URL, pool_size=config.API_POOL_SIZE, timeout=config.API_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.validators = {}
+    
+    def get(self, path, **params):
+        params = {name: value for name, value in params.items() if value is not None}
+        key = (path, tuple(sorted((name, tuple(value) if isinstance(value, list) else value) for name, value in params.items())))
+        cached = self.validators.get(key)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        
+        response = self.session.get(self.base_url + path, params=params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        
+        payload = response.json()
+        if 'ETag' in response.headers:
+            self.validators[key] = (response.headers['ETag'], payload)
+        return payload
+    
+    def get_many(self, calls):
+        futures = {name: self.executor.submit(self.get, path, **params) for name, (path, params) in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def records_frame(records, date_columns=('date', 'ds')):
+    df = pd.DataFrame(records)
+    for column in date_columns:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    return df
@@ -0,0 +1,187 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+from ingest import SCHEMAS, columnar_path, csv_path, delta_files, load_data, load_dataset
+from backend import daily_features, guest_personas
+from forecast import fit_forecast_model
+from ranking import train_ranker
+from occupancy import add_occupancy, occupancy_calendar, trim_warmup
+from cube import build_cube
+import config
+
+def manifest_path():
+    return os.path.join(config.DATASETS_PATH, config.MANIFEST_FILE)
+
+def artifacts_path():
+    return os.path.join(config.DATASETS_PATH, config.ARTIFACTS_DIR)
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest():
+    if not os.path.exists(manifest_path()):
+        return {}
+    with open(manifest_path()) as f:
+        return json.load(f)
+
+def update_manifest():
+    previous = read_manifest()
+    manifest = {}
+    paths = glob.glob(os.path.join(config.DATASETS_PATH, '*.csv'))
+    for name in SCHEMAS:
+        if not os.path.exists(csv_path(name)) and os.path.exists(columnar_path(name)):
+            paths += [columnar_path(name)] + delta_files(name)
+    for path in sorted(paths):
+        name = os.path.relpath(path, config.DATASETS_PATH)
+        stat = os.stat(path)
+        entry = previous.get(name)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            entry = {'sha256': file_hash(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+        manifest[name] = entry
+    
+    if manifest != previous:
+        tmp_path = manifest_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path())
+    return manifest
+
+def dataset_version(manifest):
+    parts = [f"{name}={entry['sha256']}" for name, entry in sorted(manifest.items())]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+
+def manifest_entry(manifest, file):
+    name = os.path.splitext(file)[0]
+    if file in manifest or f'{name}.parquet' not in manifest:
+        return manifest.get(file, {})
+    
+    entry = manifest[f'{name}.parquet']
+    deltas = [manifest[key]['sha256'] for key in sorted(manifest) if os.path.dirname(key) == os.path.join(config.DELTA_DIR, name)]
+    if deltas:
+        entry = {'sha256': hashlib.sha256('|'.join([entry['sha256']] + deltas).encode()).hexdigest()}
+    return entry
+
+def build_daily(inputs):
+    bookings, events, weather = load_data(
+        bookings_columns=config.BOOKINGS_ANALYTICS_COLUMNS,
+        weather_columns=config.WEATHER_ANALYTICS_COLUMNS,
+        compact=True
+    )
+    df = daily_features(bookings, events, weather)
+    return add_occupancy(df, load_dataset('bookings', config.OCCUPANCY_COLUMNS))
+
+def build_analytics_cube(inputs):
+    return build_cube()
+
+def build_occupancy(inputs):
+    return occupancy_calendar(load_dataset('bookings', config.OCCUPANCY_COLUMNS))
+
+def build_personas(inputs):
+    return guest_personas(load_dataset('bookings', config.BOOKINGS_ANALYTICS_COLUMNS, compact=True))
+
+def build_ranker(inputs):
+    return train_ranker(inputs['personas'], load_dataset('events'))
+
+def build_forecast_demand(inputs):
+    return fit_forecast_model(inputs['daily'], target='demand')
+
+def build_forecast_revpar(inputs):
+    return fit_forecast_model(inputs['daily'], target='revpar')
+
+def build_forecast_occupancy(inputs):
+    return fit_forecast_model(trim_warmup(inputs['daily']), target='occupancy')
+
+ARTIFACTS = {
+    'daily': {'files': ['bookings.csv', 'events.csv', 'weather.csv'], 'deps': [], 'build': build_daily, 'version': 2,
+              'config': ['BOOKINGS_ANALYTICS_COLUMNS', 'WEATHER_ANALYTICS_COLUMNS', 'OCCUPANCY_COLUMNS']},
+    'cube': {'files': ['bookings.csv'], 'deps': [], 'build': build_analytics_cube, 'config': ['CUBE_DIMENSIONS', 'CUBE_MEASURES']},
+    'occupancy': {'files': ['bookings.csv'], 'deps': [], 'build': build_occupancy, 'config': ['OCCUPANCY_COLUMNS']},
+    'personas': {'files': ['bookings.csv'], 'deps': [], 'build': build_personas,
+                 'config': ['BOOKINGS_ANALYTICS_COLUMNS', 'PERSONAS_CLUSTERS', 'RANDOM_STATE']},
+    'ranker': {'files': ['events.csv', 'web_analytics.csv'], 'deps': ['personas'], 'build': build_ranker,
+               'config': ['CTR_HASH_FEATURES', 'CTR_ALPHA', 'CTR_LEARNING_RATE', 'CTR_CHUNK_SIZE', 'RANDOM_STATE']},
+    'forecast_demand': {'files': [], 'deps': ['daily'], 'build': build_forecast_demand},
+    'forecast_revpar': {'files': [], 'deps': ['daily'], 'build': build_forecast_revpar},
+    'forecast_occupancy': {'files': [], 'deps': ['daily'], 'build': build_forecast_occupancy, 'version': 2, 'config': ['OCCUPANCY_WARMUP_DAYS']},
+}
+
+def artifact_key(name, manifest):
+    spec = ARTIFACTS[name]
+    parts = [name, config.ANALYTICS_BACKEND, str(spec.get('version', 1))]
+    parts += [f"{file}={manifest_entry(manifest, file).get('sha256', 'missing')}" for file in spec['files']]
+    parts += [f"{setting}={getattr(config, setting)!r}" for setting in spec.get('config', [])]
+    parts += [f"{dep}={artifact_key(dep, manifest)}" for dep in spec['deps']]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+
+def artifact_file(name, key):
+    return os.path.join(artifacts_path(), f'{name}-{key}.pkl')
+
+def save_artifact(name, key, value):
+    os.makedirs(artifacts_path(), exist_ok=True)
+    for old in glob.glob(os.path.join(artifacts_path(), f'{name}-*.pkl')):
+        os.remove(old)
+    tmp_path = artifact_file(name, key) + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f)
+    os.replace(tmp_path, artifact_file(name, key))
+
+def load_artifact(name, manifest=None):
+    manifest = update_manifest() if manifest is None else manifest
+    path = artifact_file(name, artifact_key(name, manifest))
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def load_or_build(name, manifest=None, built=None):
+    manifest = update_manifest() if manifest is None else manifest
+    built = {} if built is None else built
+    if name in built:
+        return built[name]
+    
+    value = load_artifact(name, manifest)
+    if value is None:
+        inputs = {dep: load_or_build(dep, manifest, built) for dep in ARTIFACTS[name]['deps']}
+        value = ARTIFACTS[name]['build'](inputs)
+        save_artifact(name, artifact_key(name, manifest), value)
+        print(f"Built artifact {name}")
+    
+    built[name] = value
+    return value
+
+def build(names=None):
+    manifest = update_manifest()
+    built = {}
+    for name in names or list(ARTIFACTS):
+        load_or_build(name, manifest, built)
+
+def status():
+    manifest = update_manifest()
+    for name in ARTIFACTS:
+        key = artifact_key(name, manifest)
+        state = 'up to date' if os.path.exists(artifact_file(name, key)) else 'stale'
+        print(f"{name:<20} {key}  {state}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build derived artifacts whose dataset inputs changed')
+    parser.add_argument('command', choices=['build', 'status'])
+    parser.add_argument('artifacts', nargs='*', help=f'Artifacts to build: {", ".join(ARTIFACTS)} (default: all)')
+    args = parser.parse_args()
+    unknown = set(args.artifacts) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f'unknown artifacts: {", ".join(sorted(unknown))}')
+    
+    if args.command == 'build':
+        build(args.artifacts)
+    else:
+        status()
+
+if __name__ == '__main__':
+    main()
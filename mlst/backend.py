@@ -0,0 +1,28 @@
+from preprocess import preprocess
+from personas import create_personas
+from impact import measure_impact
+from incremental import aggregates_are_current, load_aggregates
+import config
+
+def use_duckdb():
+    return config.ANALYTICS_BACKEND == 'duckdb'
+
+def daily_features(bookings, events, weather):
+    if config.USE_DAILY_AGGREGATES and aggregates_are_current():
+        return load_aggregates()
+    if use_duckdb():
+        import duckdb_backend
+        return duckdb_backend.preprocess()
+    return preprocess(bookings, events, weather)
+
+def guest_personas(bookings):
+    if use_duckdb():
+        import duckdb_backend
+        return duckdb_backend.create_personas()
+    return create_personas(bookings)
+
+def booking_impact(bookings, recommendations):
+    if use_duckdb():
+        import duckdb_backend
+        return duckdb_backend.measure_impact(recommendations)
+    return measure_impact(bookings, recommendations)
@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+from ingest import load_data, load_window
+from preprocess import preprocess
+from personas import create_personas
+from recommend import collaborative_filtering, content_based_filtering, recommend_events
+from forecast import train_forecast
+from impact import measure_impact
+from artifacts import update_manifest
+import config
+
+GENERATORS_PATH = os.path.join(config.PROJECT_ROOT, 'dataset_generators')
+
+def benchmark_path(*parts):
+    return os.path.join(config.PROJECT_ROOT, config.BENCHMARK_DIR, *parts)
+
+def datasets_path(scale):
+    return benchmark_path('datasets', f'scale-{scale:g}')
+
+@contextmanager
+def datasets_at(path):
+    previous = config.DATASETS_PATH
+    config.DATASETS_PATH = path
+    try:
+        yield
+    finally:
+        config.DATASETS_PATH = previous
+
+def generate_datasets(scale, regenerate=False):
+    path = datasets_path(scale)
+    if not regenerate and os.path.exists(os.path.join(path, 'web_analytics.csv')):
+        return path
+    
+    if GENERATORS_PATH not in sys.path:
+        sys.path.insert(0, GENERATORS_PATH)
+    from generate_weather import generate_weather
+    from generate_events import generate_events
+    from generate_bookings import generate_accommodations, generate_bookings
+    from generate_web_analytics import generate_web_analytics
+    
+    weather_seed, events_seed, accommodations_seed, bookings_seed, web_seed = np.random.SeedSequence(config.RANDOM_STATE).spawn(5)
+    with datasets_at(path):
+        generate_weather(weather_seed, fmt='csv')
+        generate_events(events_seed, scale, fmt='csv')
+        accommodations = generate_accommodations(seed=accommodations_seed, scale=scale)
+        generate_bookings(accommodations, bookings_seed, scale=scale, fmt='csv')
+        generate_web_analytics(web_seed)
+    return path
+
+def measure(run, setup=tuple, repeat=config.BENCHMARK_REPEAT):
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    
+    args = setup()
+    tracemalloc.start()
+    try:
+        run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak / 1024 ** 2
+
+def recommendation_window(events):
+    start_date = pd.to_datetime(events['date']).quantile(0.5).date()
+    return start_date, start_date + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+
+def stage_cases(bookings, events, weather, guest_id, start_date, end_date):
+    window = load_window('events', start_date, end_date)
+    daily = preprocess(bookings.copy(), events.copy(), weather.copy())
+    personas = create_personas(bookings)
+    recommendations = recommend_events(guest_id, config.DEFAULT_RECOMMENDATIONS * 2, start_date, end_date, bookings=bookings, personas=personas)
+    
+    return [
+        ('preprocess', len(bookings), preprocess, lambda: (bookings.copy(), events.copy(), weather.copy())),
+        ('create_personas', len(bookings), create_personas, lambda: (bookings,)),
+        ('collaborative_filtering', len(bookings), collaborative_filtering, lambda: (window.copy(), guest_id, bookings.copy())),
+        ('content_based_filtering', len(bookings), content_based_filtering, lambda: (window.copy(), guest_id, personas, bookings)),
+        ('train_forecast', len(daily), train_forecast, lambda: (daily,)),
+        ('measure_impact', len(bookings), measure_impact, lambda: (bookings, recommendations))
+    ]
+
+def endpoint_cases(guest_id, start_date, end_date):
+    window = {'start_date': str(start_date), 'end_date': str(end_date)}
+    return [
+        ('/forecast/demand', '/forecast/demand', {}),
+        ('/forecast/revpar', '/forecast/revpar', {}),
+        ('/forecast/occupancy', '/forecast/occupancy', {}),
+        ('/occupancy', '/occupancy', window),
+        ('/eda/daily', '/eda/daily', {}),
+        ('/eda/demand', '/eda/demand', {}),
+        ('/eda/monthly', '/eda/monthly', {}),
+        ('/eda/revpar-histogram', '/eda/revpar-histogram', {}),
+        ('/eda/temperature', '/eda/temperature', {}),
+        ('/eda/event-intensity', '/eda/event-intensity', {}),
+        ('/eda/segments', '/eda/segments', {'by': 'type'}),
+        ('/impact', '/impact', {}),
+        ('/recommend/{guest_id}', f'/recommend/{guest_id}', window),
+        ('/itinerary/{guest_id}', f'/itinerary/{guest_id}', window)
+    ]
+
+def result(name, scale, seconds, median_seconds, peak_mb, work, unit):
+    row = {
+        'name': name,
+        'scale': scale,
+        'seconds': seconds,
+        'median_seconds': median_seconds,
+        'peak_mb': peak_mb,
+        'throughput': work / seconds if seconds > 0 else None,
+        'unit': unit
+    }
+    print(f"{name:<36} x{scale:<5g} {seconds * 1000:10.1f} ms {peak_mb:9.1f} MB {row['throughput'] or 0:14,.0f} {unit}")
+    return row
+
+def run_scale(scale, repeat, regenerate=False):
+    results = []
+    with datasets_at(generate_datasets(scale, regenerate)):
+        bookings, events, weather = load_data(
+            bookings_columns=config.BOOKINGS_ANALYTICS_COLUMNS,
+            weather_columns=config.WEATHER_ANALYTICS_COLUMNS,
+            compact=True
+        )
+        guest_id = int(bookings['guest_id'].value_counts().idxmax())
+        start_date, end_date = recommendation_window(events)
+        
+        for name, rows, run, setup in stage_cases(bookings, events, weather, guest_id, start_date, end_date):
+            results.append(result(f'stage {name}', scale, *measure(run, setup, repeat), rows, 'rows/s'))
+        
+        import api
+        api.state = api.build_state(update_manifest())
+        client = TestClient(api.app)
+        
+        def request(path, params):
+            api.state['responses'].clear()
+            client.get(path, params=params).raise_for_status()
+        
+        for name, path, params in endpoint_cases(guest_id, start_date, end_date):
+            results.append(result(f'GET {name}', scale, *measure(request, lambda: (path, params), repeat), 1, 'requests/s'))
+    return results
+
+def machine():
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count()
+    }
+
+def run_benchmarks(scales=config.BENCHMARK_SCALES, repeat=config.BENCHMARK_REPEAT, regenerate=False):
+    results = []
+    for scale in scales:
+        results += run_scale(scale, repeat, regenerate)
+    return {'created_at': datetime.now().isoformat(timespec='seconds'), 'machine': machine(), 'repeat': repeat, 'results': results}
+
+def write_results(report, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def read_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def percent_change(current, base):
+    return (current - base) / base * 100 if base else 0.0
+
+def compare(report, baseline, tolerance=config.BENCHMARK_TOLERANCE):
+    base = {(row['name'], row['scale']): row for row in baseline['results']}
+    regressions = []
+    
+    if baseline.get('machine') != report['machine']:
+        print(f"Note: baseline was recorded on {baseline.get('machine')}, comparing anyway")
+    print(f"{'benchmark':<36} {'scale':<6} {'time':>9} {'change':>8} {'peak MB':>9} {'change':>8}  status")
+    for row in report['results']:
+        key = (row['name'], row['scale'])
+        if key not in base:
+            print(f"{row['name']:<36} x{row['scale']:<5g} {row['seconds'] * 1000:7.1f}ms {'':>8} {row['peak_mb']:9.1f} {'':>8}  new")
+            continue
+        
+        before = base[key]
+        slower = row['seconds'] - before['seconds'] > max(config.BENCHMARK_MIN_SECONDS, tolerance * before['seconds'])
+        bigger = row['peak_mb'] - before['peak_mb'] > max(config.BENCHMARK_MIN_MB, tolerance * before['peak_mb'])
+        problems = [problem for problem, failed in [('slower', slower), ('more memory', bigger)] if failed]
+        if problems:
+            regressions.append((row, before, problems))
+        print(f"{row['name']:<36} x{row['scale']:<5g} {row['seconds'] * 1000:7.1f}ms "
+              f"{percent_change(row['seconds'], before['seconds']):+7.1f}% {row['peak_mb']:9.1f} "
+              f"{percent_change(row['peak_mb'], before['peak_mb']):+7.1f}%  {', '.join(problems) or 'ok'}")
+    
+    for key in sorted(set(base) - {(row['name'], row['scale']) for row in report['results']}):
+        print(f"{key[0]:<36} x{key[1]:<5g} missing from this run")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline stages and API endpoints on synthetic datasets')
+    parser.add_argument('--scales', type=float, nargs='+', default=config.BENCHMARK_SCALES, help=f'Dataset scale factors (default: {config.BENCHMARK_SCALES})')
+    parser.add_argument('--repeat', type=int, default=config.BENCHMARK_REPEAT, help=f'Timed runs per benchmark; the fastest is compared (default: {config.BENCHMARK_REPEAT})')
+    parser.add_argument('--output', default=benchmark_path(config.BENCHMARK_RESULTS_FILE), help='Results file')
+    parser.add_argument('--baseline', default=benchmark_path(config.BENCHMARK_BASELINE_FILE), help='Baseline to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=config.BENCHMARK_TOLERANCE, help=f'Relative slowdown or memory growth that fails the run (default: {config.BENCHMARK_TOLERANCE})')
+    parser.add_argument('--regenerate', action='store_true', help='Regenerate the benchmark datasets even if they exist')
+    args = parser.parse_args()
+    
+    report = run_benchmarks(args.scales, args.repeat, args.regenerate)
+    write_results(report, args.output)
+    print(f"Wrote {len(report['results'])} results -> {args.output}")
+    
+    if args.save_baseline:
+        write_results(report, args.baseline)
+        print(f"Saved baseline -> {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    
+    regressions = compare(report, read_results(args.baseline), args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for row, before, problems in regressions:
+            print(f"  {row['name']} x{row['scale']:g}: {before['seconds'] * 1000:.1f} ms -> {row['seconds'] * 1000:.1f} ms, "
+                  f"{before['peak_mb']:.1f} MB -> {row['peak_mb']:.1f} MB ({', '.join(problems)})")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == '__main__':
+    main()
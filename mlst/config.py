@@ -6,9 +6,59 @@ DATASETS_PATH = os.path.join(PROJECT_ROOT, DATASETS_DIR)
 BOOKINGS_FILE = f'{DATASETS_DIR}/bookings.csv'
 EVENTS_FILE = f'{DATASETS_DIR}/events.csv'
 WEATHER_FILE = f'{DATASETS_DIR}/weather.csv'
+WEB_ANALYTICS_FILE = f'{DATASETS_DIR}/web_analytics.csv'
+PARTITIONED_DIR = 'partitioned'
+DELTA_DIR = 'delta'
+COLUMNAR_MAX_DELTA_FILES = 256  # appended parquet parts per dataset before they are compacted into the base file; 0 never compacts
+DAILY_AGGREGATES_FILE = 'daily_aggregates.parquet'
+MANIFEST_FILE = 'manifest.json'
+ARTIFACTS_DIR = 'artifacts'
+
+BOOKINGS_ANALYTICS_COLUMNS = [
+    'guest_id', 'date', 'rooms_booked', 'revenue_available_room',
+    'accommodation_units', 'age', 'average_daily_rate', 'country_id'
+]
+WEATHER_ANALYTICS_COLUMNS = ['date', 'precipitation', 'temperature_max']
+OCCUPANCY_COLUMNS = [
+    'accommodation_id', 'accommodation_units', 'arrival_date',
+    'departure_date', 'rooms_booked', 'deleted_at'
+]
+OCCUPANCY_WARMUP_DAYS = 90 + 14  # max booking lead time + max stay: earlier nights miss stays booked before the data starts
+CUBE_DIMENSIONS = ['date', 'type', 'stars', 'guest_country']
+CUBE_MEASURES = ['bookings', 'rooms_booked', 'revenue_available_room', 'accommodation_units']
+PII_COLUMNS = ['uuid', 'first_name', 'last_name', 'email', 'address']
+CATEGORY_MAX_RATIO = 0.5
+CHUNK_SIZE = 500000
+
+ANALYTICS_BACKEND = 'pandas'  # 'pandas' or 'duckdb'
+DUCKDB_THREADS = os.cpu_count()
+USE_DAILY_AGGREGATES = True
+
+STREAM_BATCH_SIZE = 500
+STREAM_BATCH_SECONDS = 1.0
+STREAM_QUEUE_SIZE = 10000
+STREAM_POLL_SECONDS = 0.2
+STREAM_REPORT_SECONDS = 10
 
 API_PORT = 8000
 DASHBOARD_PORT = 8501
+DASHBOARD_MODE = 'local'  # 'local' computes in-process, 'api' fetches everything from the API service
+API_URL = f'http://localhost:{API_PORT}'
+API_POOL_SIZE = 8
+API_TIMEOUT = 120
+EDA_CACHE_MAX_AGE = 300  # seconds clients may reuse /eda responses before revalidating
+RESPONSE_CACHE_ENTRIES = 256  # cached /eda and /impact bodies per dataset version, least recently used evicted first
+RELOAD_POLL_SECONDS = 0  # > 0 polls DATASETS_PATH and hot-reloads the API on change
+IMPRESSION_LOG_ROWS = 1000000  # online /impressions rows kept to replay into a retrained ranker on reload
+METRICS_SPANS = True  # time recommend/forecast/preprocess stages into /metrics; False makes spans no-ops
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PROFILE_ENABLED = False  # let requests with an X-Profile: 1 header or ?profile=1 be profiled
+PROFILE_SAMPLE_RATE = 1.0  # fraction of flagged requests that are actually profiled
+PROFILE_INTERVAL = 0.005  # seconds between CPU stack samples
+PROFILE_TRACEMALLOC_FRAMES = 1
+PROFILE_KEEP = 5  # profiles kept per endpoint
+PROFILE_STORED_SITES = 100  # allocation sites kept per profile
+PROFILE_TOP = 20
 
 DEFAULT_FORECAST_PERIODS = 30
 DEFAULT_RECOMMENDATIONS = 5
@@ -20,6 +70,11 @@ PERSONAS_CLUSTERS = 3
 RANDOM_STATE = 42
 SIMILAR_USERS_COUNT = 10
 
+CTR_HASH_FEATURES = 2 ** 18
+CTR_CHUNK_SIZE = 100000
+CTR_ALPHA = 1e-5
+CTR_LEARNING_RATE = 0.01
+
 DATASET_START_DATE = '2023-12-01'
 DATASET_END_DATE = '2026-02-28'
 
@@ -27,4 +82,33 @@ DATASET_N_ACCOMMODATIONS = 50
 DATASET_BASE_BOOKINGS_PER_DAY = 100
 DATASET_MIN_BOOKINGS_PER_DAY = 50
 DATASET_MAX_BOOKINGS_PER_DAY = 200
+DATASET_SCALE = 1  # multiplies accommodations, bookings per day and events per day
+DATASET_SPAN_SCALE = 1  # multiplies the number of days from DATASET_START_DATE
+GENERATION_WORKERS = os.cpu_count()
+GENERATION_SHARD_DAYS = 31
+GENERATION_BATCH_SIZE = 100000  # rows per batch appended to a generated dataset
+GENERATION_FORMAT = 'csv'  # 'csv' or 'parquet' for bookings, events and weather
+
+
+BENCHMARK_DIR = 'benchmarks'
+BENCHMARK_RESULTS_FILE = 'results.json'
+BENCHMARK_BASELINE_FILE = 'baseline.json'
+BENCHMARK_SCALES = [0.5, 1, 2]
+BENCHMARK_REPEAT = 5
+BENCHMARK_TOLERANCE = 0.3  # relative slowdown or memory growth reported as a regression
+BENCHMARK_MIN_SECONDS = 0.01  # smaller absolute slowdowns are treated as noise
+BENCHMARK_MIN_MB = 1.0
 
+LOADTEST_RATE = 20  # target requests per second, open loop with Poisson arrivals
+LOADTEST_DURATION = 30
+LOADTEST_CONNECTIONS = 32
+LOADTEST_TIMEOUT = 30
+LOADTEST_ZIPF_EXPONENT = 1.1  # guest popularity ~ 1 / rank ** exponent, ranked by bookings
+LOADTEST_STARTUP_SECONDS = 300
+LOADTEST_MIX = {
+    '/forecast/demand': 1,
+    '/forecast/revpar': 1,
+    '/forecast/occupancy': 1,
+    '/recommend/{guest_id}': 5,
+    '/itinerary/{guest_id}': 2
+}
@@ -0,0 +1,63 @@
+import pandas as pd
+from ingest import iter_chunks
+import config
+
+SUM_COLUMNS = [measure for measure in config.CUBE_MEASURES if measure != 'bookings']
+
+TIME_LEVELS = {
+    'year': lambda dates: dates.dt.year,
+    'month': lambda dates: dates.dt.month,
+    'weekday': lambda dates: dates.dt.weekday,
+    'year_month': lambda dates: dates.dt.to_period('M').astype(str)
+}
+
+def cube_cells(bookings):
+    bookings = bookings.assign(bookings=1, date=pd.to_datetime(bookings['date']))
+    return bookings.groupby(config.CUBE_DIMENSIONS, observed=True)[config.CUBE_MEASURES].sum()
+
+def compact_cube(cube):
+    for column in ['type', 'guest_country']:
+        cube[column] = cube[column].astype('category')
+    cube['stars'] = pd.to_numeric(cube['stars'], downcast='integer')
+    for measure in config.CUBE_MEASURES:
+        cube[measure] = pd.to_numeric(cube[measure], downcast='integer')
+    return cube
+
+def build_cube(chunksize=config.CHUNK_SIZE):
+    cube = None
+    for chunk in iter_chunks('bookings', config.CUBE_DIMENSIONS + SUM_COLUMNS, chunksize):
+        cells = cube_cells(chunk)
+        cube = cells if cube is None else pd.concat([cube, cells]).groupby(level=config.CUBE_DIMENSIONS).sum()
+    
+    if cube is None:
+        return pd.DataFrame(columns=config.CUBE_DIMENSIONS + config.CUBE_MEASURES)
+    return compact_cube(cube.reset_index())
+
+def slice_cube(cube, **filters):
+    mask = pd.Series(True, index=cube.index)
+    for column, value in filters.items():
+        if value is None:
+            continue
+        if column == 'start_date':
+            mask &= cube['date'] >= pd.Timestamp(value)
+        elif column == 'end_date':
+            mask &= cube['date'] <= pd.Timestamp(value)
+        elif isinstance(value, (list, tuple, set)):
+            mask &= cube[column].isin(value)
+        else:
+            mask &= cube[column] == value
+    return cube[mask]
+
+def rollup(cube, by=(), **filters):
+    cube = slice_cube(cube, **filters)
+    keys = [TIME_LEVELS[level](cube['date']).rename(level) if level in TIME_LEVELS else cube[level] for level in by]
+    
+    if keys:
+        totals = cube.groupby(keys, observed=True)[config.CUBE_MEASURES].sum().reset_index()
+    else:
+        totals = cube[config.CUBE_MEASURES].sum().to_frame().T
+    totals[config.CUBE_MEASURES] = totals[config.CUBE_MEASURES].astype('int64')
+    
+    totals['revpar'] = totals['revenue_available_room'] / totals['accommodation_units']
+    totals['rooms_per_booking'] = totals['rooms_booked'] / totals['bookings']
+    return totals
@@ -0,0 +1,158 @@
+import streamlit as st
+from api_client import ApiClient, records_frame
+import pandas as pd
+import matplotlib.pyplot as plt
+import requests
+from datetime import date, timedelta
+import config
+
+st.title("Tourism Forecasting & Recommendations")
+
+@st.cache_resource
+def api_client():
+    return ApiClient()
+
+client = api_client()
+try:
+    version = client.get('/admin/version')['version']
+except requests.RequestException:
+    st.write(f"API not reachable at {config.API_URL}. Start it with `python main.py` or `uvicorn api:app`.")
+    st.stop()
+
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["EDA", "Forecast", "Impact", "Recommendations", "Itinerary"], key="tab", on_change="rerun")
+
+with tab1:
+    if tab1.open:
+        st.header("Exploratory Data Analysis")
+        dimension = st.selectbox("Break down by", ['type', 'stars', 'guest_country', 'month'])
+        measure = st.selectbox("Measure", ['rooms_booked', 'bookings', 'revenue_available_room', 'revpar'])
+        star_filter = st.multiselect("Stars", [1, 2, 3, 4, 5])
+        
+        eda = client.get_many({
+            'demand': ('/eda/demand', {}),
+            'monthly': ('/eda/monthly', {}),
+            'histogram': ('/eda/revpar-histogram', {'bins': 40}),
+            'temperature': ('/eda/temperature', {}),
+            'event_intensity': ('/eda/event-intensity', {}),
+            'segments': ('/eda/segments', {'by': dimension, 'stars': star_filter or None})
+        })
+        
+        fig1, ax1 = plt.subplots(figsize=(12, 4))
+        records_frame(eda['demand']).set_index('date')['demand'].plot(ax=ax1)
+        ax1.set_title('Rooms Sold Over Time')
+        ax1.set_xlabel('Date')
+        ax1.set_ylabel('Rooms Sold')
+        st.pyplot(fig1)
+        
+        fig2, ax2 = plt.subplots(figsize=(10, 4))
+        records_frame(eda['monthly']).set_index('month')['avg_demand'].plot(kind='bar', ax=ax2)
+        ax2.set_title('Average Rooms Sold by Month')
+        ax2.set_xlabel('Month')
+        ax2.set_ylabel('Avg Rooms Sold')
+        st.pyplot(fig2)
+        
+        histogram = records_frame(eda['histogram'])
+        fig3, ax3 = plt.subplots(figsize=(10, 4))
+        ax3.bar(histogram['bin_start'], histogram['count'], width=histogram['bin_end'] - histogram['bin_start'], align='edge')
+        ax3.set_title('RevPAR Distribution')
+        ax3.set_xlabel('RevPAR')
+        ax3.set_ylabel('Frequency')
+        st.pyplot(fig3)
+        
+        fig4, ax4 = plt.subplots(figsize=(10, 4))
+        records_frame(eda['temperature']).plot.scatter(x='temperature_max', y='demand', ax=ax4)
+        ax4.set_title('Rooms Sold vs Temperature')
+        st.pyplot(fig4)
+        
+        boxes = records_frame(eda['event_intensity'])
+        fig5, ax5 = plt.subplots(figsize=(10, 4))
+        ax5.bxp([
+            {'label': f"{row.event_intensity:g}", 'whislo': row.min, 'q1': row.q1, 'med': row.median, 'q3': row.q3, 'whishi': row.max, 'fliers': []}
+            for row in boxes.itertuples()
+        ])
+        ax5.set_title('Rooms Sold by Event Intensity')
+        st.pyplot(fig5)
+        
+        st.subheader("Bookings by Segment")
+        fig6, ax6 = plt.subplots(figsize=(10, 4))
+        records_frame(eda['segments']).set_index(dimension)[measure].sort_index().plot(kind='bar', ax=ax6)
+        ax6.set_title(f'{measure} by {dimension}')
+        ax6.set_xlabel(dimension)
+        st.pyplot(fig6)
+
+with tab2:
+    if tab2.open:
+        st.header("Demand, RevPAR & Occupancy Forecast")
+        periods = st.slider("Forecast periods", 7, 90, config.DEFAULT_FORECAST_PERIODS)
+        
+        results = client.get_many({
+            'daily': ('/eda/daily', {}),
+            'demand': ('/forecast/demand', {'periods': periods}),
+            'revpar': ('/forecast/revpar', {'periods': periods}),
+            'occupancy': ('/forecast/occupancy', {'periods': periods})
+        })
+        df = records_frame(results['daily'])
+        
+        fig, axes = plt.subplots(3, 1, figsize=(12, 12))
+        titles = {'demand': 'Demand Forecast', 'revpar': 'RevPAR Forecast', 'occupancy': 'Occupancy Forecast (rooms occupied per night)'}
+        for ax, (target, title) in zip(axes, titles.items()):
+            forecast = records_frame(results[target])
+            ax.plot(df['date'], df[target], label='Actual')
+            ax.plot(forecast['ds'], forecast['yhat'], label='Forecast')
+            ax.set_title(title)
+            ax.legend()
+        
+        st.pyplot(fig)
+
+with tab3:
+    if tab3.open:
+        st.header("Impact Measurement")
+        impact = client.get('/impact')
+        
+        st.metric("Conversion Rate", f"{impact['conversion_rate']:.2%}")
+        st.metric("Avg Bookings (with recs)", f"{impact['avg_bookings_with_recommendations']:.2f}")
+        st.metric("Avg Bookings (without recs)", f"{impact['avg_bookings_without_recommendations']:.2f}")
+        st.metric("Improvement", f"{impact['improvement']:.2f}%")
+
+with tab4:
+    if tab4.open:
+        st.header("Event Recommendations")
+        guest_id = st.number_input("Guest ID", min_value=1, value=1)
+        n = st.slider("Number of recommendations", 1, 20, config.DEFAULT_RECOMMENDATIONS)
+        
+        today = date.today()
+        default_end = today + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+        start_date = st.date_input("Start date", value=today, min_value=today)
+        end_date = st.date_input("End date", value=default_end, min_value=today)
+        
+        if start_date and end_date:
+            recs = records_frame(client.get(f'/recommend/{guest_id}', n=n, start_date=start_date, end_date=end_date))
+        else:
+            recs = pd.DataFrame()
+        
+        if len(recs) > 0:
+            st.dataframe(recs[['date', 'type', 'name', 'location', 'expected_attendance']])
+        else:
+            st.write("No available events")
+
+with tab5:
+    if tab5.open:
+        st.header("Itinerary")
+        guest_id = st.number_input("Guest ID", min_value=1, value=1, key="itinerary_guest")
+        days = st.slider("Number of days", 1, 10, config.DEFAULT_ITINERARY_DAYS)
+        n_per_day = st.slider("Events per day", 1, 5, config.DEFAULT_EVENTS_PER_DAY)
+        
+        today = date.today()
+        default_end = today + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+        start_date = st.date_input("Start date", value=today, min_value=today, key="itinerary_start")
+        end_date = st.date_input("End date", value=default_end, min_value=today, key="itinerary_end")
+        
+        if start_date and end_date:
+            recs = records_frame(client.get(f'/recommend/{guest_id}', n=days * n_per_day, start_date=start_date, end_date=end_date))
+        else:
+            recs = pd.DataFrame()
+        
+        if len(recs) > 0:
+            st.dataframe(recs[['date', 'type', 'name', 'location', 'expected_attendance']])
+        else:
+            st.write("No available events")
@@ -7,6 +7,20 @@ Generates all datasets in the correct order:
 2. Events (can reference weather)
 3. Bus Schedules (independent)
 4. Bookings (correlates with events and weather)
+5. Web analytics (recommendations shown per booking)
+
+Weather, events and bus schedules are independent and run in parallel.
+Bookings are generated in date shards on a process pool. Every generator
+and shard gets its own SeedSequence-spawned stream, so the output only
+depends on --seed, never on --workers.
+
+Every generator streams fixed-size batches to its output file, so memory
+stays flat as --scale and --span grow. With --format parquet, bookings,
+events and weather are written straight to the typed columnar format;
+otherwise the CSVs are converted afterwards.
+
+Finally writes month-partitioned copies for date-window reads, builds the
+daily aggregate table and prebuilds the derived artifacts.
 
 All datasets span: November 2023 - November 2025
 All datasets focus on: Amsterdam only
@@ -14,24 +28,58 @@ All datasets focus on: Amsterdam only
 
 import sys
 import os
-from datetime import datetime
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from ingest import build_columnar, build_partitioned
+from incremental import build_aggregates
+from artifacts import build as build_artifacts
 from generate_weather import generate_weather
 from generate_events import generate_events
 from generate_bus_schedules import generate_bus_schedules
 from generate_bookings import generate_bookings, generate_accommodations
 from generate_web_analytics import generate_web_analytics
+from writer import FORMATS
+
+def generate_independent(weather_seed, events_seed, workers, scale, span, fmt):
+    """Weather, events and bus schedules do not read each other, so they can run side by side."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, 3)) as executor:
+            futures = [
+                executor.submit(generate_weather, weather_seed, span, fmt),
+                executor.submit(generate_events, events_seed, scale, span, fmt),
+                executor.submit(generate_bus_schedules, span)
+            ]
+            for future in futures:
+                future.result()
+    else:
+        generate_weather(weather_seed, span, fmt)
+        generate_events(events_seed, scale, span, fmt)
+        generate_bus_schedules(span)
+
 
 def main():
     """Main function to generate all datasets."""
-    generate_weather()
-    generate_events()
-    generate_bus_schedules()
+    parser = argparse.ArgumentParser(description='Generate all Amsterdam datasets')
+    parser.add_argument('--workers', type=int, default=config.GENERATION_WORKERS, help=f'Worker processes (default: {config.GENERATION_WORKERS})')
+    parser.add_argument('--seed', type=int, default=config.RANDOM_STATE, help=f'Root random seed (default: {config.RANDOM_STATE})')
+    parser.add_argument('--scale', type=float, default=config.DATASET_SCALE, help='Volume multiplier: accommodations, bookings and events per day (default: %(default)s)')
+    parser.add_argument('--span', type=float, default=config.DATASET_SPAN_SCALE, help='Date span multiplier (default: %(default)s)')
+    parser.add_argument('--format', choices=FORMATS, default=config.GENERATION_FORMAT, help='Output format for bookings, events and weather; bus schedules and web analytics are always CSV (default: %(default)s)')
+    args = parser.parse_args()
+    
+    weather_seed, events_seed, accommodations_seed, bookings_seed, web_seed = np.random.SeedSequence(args.seed).spawn(5)
+    generate_independent(weather_seed, events_seed, args.workers, args.scale, args.span, args.format)
     
-    accommodations_df = generate_accommodations()
-    generate_bookings(accommodations_df)
-    generate_web_analytics()
+    accommodations_df = generate_accommodations(seed=accommodations_seed, scale=args.scale)
+    generate_bookings(accommodations_df, bookings_seed, args.workers, args.scale, args.span, args.format)
+    generate_web_analytics(web_seed)
+    build_columnar()
+    build_partitioned()
+    build_aggregates()
+    build_artifacts()
 
 
 if __name__ == '__main__':
@@ -12,16 +12,17 @@ Generates realistic bookings.csv for Amsterdam with:
 
 import pandas as pd
 import numpy as np
-import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-
-# Set random seed for reproducibility
-np.random.seed(config.RANDOM_STATE)
+from scaling import dataset_dates
+from writer import FORMATS, rebatch, write_dataset
+from ingest import load_dataset
 
 # Sample data pools
 FIRST_NAMES = [
@@ -75,24 +76,25 @@ AMSTERDAM_DISTRICTS = [
 ]
 
 
-def generate_accommodations(n_accommodations=None):
+def generate_accommodations(n_accommodations=None, seed=config.RANDOM_STATE, scale=config.DATASET_SCALE):
     if n_accommodations is None:
-        n_accommodations = config.DATASET_N_ACCOMMODATIONS
+        n_accommodations = int(round(config.DATASET_N_ACCOMMODATIONS * scale))
     """Generate accommodation data with Amsterdam addresses."""
+    rng = np.random.default_rng(seed)
     accommodations = []
     for i in range(1, n_accommodations + 1):
-        acc_type = np.random.choice(ACCOMMODATION_TYPES)
-        cap_type = np.random.choice(CAPACITY_TYPES)
-        stars = np.random.choice([3, 4, 5], p=[0.3, 0.5, 0.2])
-        acc_name = np.random.choice(AMSTERDAM_ACCOMMODATION_NAMES)
+        acc_type = rng.choice(ACCOMMODATION_TYPES)
+        cap_type = rng.choice(CAPACITY_TYPES)
+        stars = rng.choice([3, 4, 5], p=[0.3, 0.5, 0.2])
+        acc_name = rng.choice(AMSTERDAM_ACCOMMODATION_NAMES)
         if i <= len(AMSTERDAM_ACCOMMODATION_NAMES):
             acc_name = AMSTERDAM_ACCOMMODATION_NAMES[i-1]
         else:
             acc_name = f"{acc_name} {i}"
         
-        street = np.random.choice(AMSTERDAM_STREETS)
-        district = np.random.choice(AMSTERDAM_DISTRICTS)
-        house_number = np.random.randint(1, 300)
+        street = rng.choice(AMSTERDAM_STREETS)
+        district = rng.choice(AMSTERDAM_DISTRICTS)
+        house_number = rng.integers(1, 300)
         address = f"{house_number} {street}, {district}, Amsterdam, Netherlands"
         
         accommodations.append({
@@ -102,7 +104,7 @@ def generate_accommodations(n_accommodations=None):
             'address': address,
             'stars': stars,
             'capacity_type': cap_type,
-            'accommodation_units': np.random.randint(10, 200),
+            'accommodation_units': rng.integers(10, 200),
             'type': acc_type
         })
     return pd.DataFrame(accommodations)
@@ -158,144 +160,246 @@ def calculate_booking_multiplier(date_str, events_by_date, weather_by_date):
     return max(0.5, multiplier)  # Ensure minimum 50% of base
 
 
-def generate_bookings(accommodations_df):
-    events_file = os.path.join(config.DATASETS_PATH, 'events.csv')
-    weather_file = os.path.join(config.DATASETS_PATH, 'weather.csv')
-    output_file = os.path.join(config.DATASETS_PATH, 'bookings.csv')
-    start_date = datetime.strptime(config.DATASET_START_DATE, '%Y-%m-%d')
-    end_date = datetime.strptime(config.DATASET_END_DATE, '%Y-%m-%d')
-    print("Generating bookings...")
-    bookings = []
+def load_correlations(scale=config.DATASET_SCALE):
+    """Load per-date event attendance and weather used to scale daily booking volume.
     
-    if os.path.exists(events_file):
-        df_events = pd.read_csv(events_file)
-        events_by_date = df_events.groupby('date')['expected_attendance'].sum().to_dict()
+    Reads whichever of CSV or Parquet the other generators wrote.
+    
+    Attendance is divided by the scale factor so a scaled city hits the same
+    event thresholds in calculate_booking_multiplier as the base one.
+    """
+    df_events = load_dataset('events', ['date', 'expected_attendance'])
+    if len(df_events) > 0:
+        attendance = df_events.groupby(df_events['date'].dt.strftime('%Y-%m-%d'))['expected_attendance'].sum()
+        events_by_date = (attendance / scale).to_dict()
     else:
         events_by_date = {}
     
-    if os.path.exists(weather_file):
-        df_weather = pd.read_csv(weather_file)
-        weather_by_date = df_weather.set_index('date').to_dict('index')
+    df_weather = load_dataset('weather')
+    if len(df_weather) > 0:
+        weather_by_date = df_weather.set_index(df_weather['date'].dt.strftime('%Y-%m-%d')).to_dict('index')
     else:
         weather_by_date = {}
     
-    current_date = start_date
-    date_range = []
-    while current_date <= end_date:
-        date_range.append(current_date)
-        current_date += timedelta(days=1)
+    return events_by_date, weather_by_date
+
+
+def daily_booking_counts(dates, events_by_date, weather_by_date, scale=config.DATASET_SCALE):
+    """Number of bookings made on each date."""
+    base_bookings_per_day = config.DATASET_BASE_BOOKINGS_PER_DAY * scale
+    counts = [
+        int(base_bookings_per_day * calculate_booking_multiplier(date_str, events_by_date, weather_by_date))
+        for date_str in np.datetime_as_string(dates, unit='D')
+    ]
+    min_bookings = int(config.DATASET_MIN_BOOKINGS_PER_DAY * scale)
+    max_bookings = int(config.DATASET_MAX_BOOKINGS_PER_DAY * scale)
+    return np.clip(np.array(counts, dtype=np.int64), min_bookings, max_bookings)
+
+
+HEX_DIGITS = np.array(list('0123456789abcdef'), dtype='S1')
+UUID_DASHES = [8, 12, 16, 20]
+
+
+def random_uuids(rng, n):
+    """Random version 4 UUID strings, drawn from rng so they are reproducible."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    
+    digits = np.empty((n, 32), dtype='S1')
+    digits[:, 0::2] = HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = HEX_DIGITS[raw & 0x0F]
+    digits = np.insert(digits, UUID_DASHES, b'-', axis=1)
+    return digits.view('S36').ravel().astype(str)
+
+
+def format_dates(days, suffix=''):
+    """Format each distinct day once and index into the table, since bookings repeat the same few hundred days."""
+    first_day = days.min()
+    calendar = np.arange(first_day, days.max() + 1)
+    labels = np.char.add(np.datetime_as_string(calendar, unit='D'), suffix)
+    return labels[(days - first_day).astype(np.int64)]
+
+
+def format_timestamps(days):
+    return format_dates(days, ' 00:00:00')
+
+
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com']
+GUEST_CODES = ['first_name', 'last_name', 'domain', 'age', 'country']
+
+
+def generate_guests(rng, n_guests):
+    """Attributes for new guests as one uint8 code per column in GUEST_CODES; guest_frame spells them out."""
+    return np.column_stack([
+        rng.integers(0, len(FIRST_NAMES), n_guests),
+        rng.integers(0, len(LAST_NAMES), n_guests),
+        rng.integers(0, len(EMAIL_DOMAINS), n_guests),
+        rng.integers(18, 80, n_guests),
+        rng.integers(0, len(GUEST_COUNTRIES), n_guests)
+    ]).astype(np.uint8)
+
+
+def guest_frame(codes):
+    """Guest columns of a booking frame from their codes."""
+    first_names = pd.Series(np.array(FIRST_NAMES)[codes[:, 0]])
+    last_names = pd.Series(np.array(LAST_NAMES)[codes[:, 1]])
+    domains = np.array(EMAIL_DOMAINS)[codes[:, 2]]
+    return pd.DataFrame({
+        'first_name': first_names,
+        'last_name': last_names,
+        'email': first_names.str.lower() + '.' + last_names.str.lower() + '@' + domains,
+        'age': codes[:, 3].astype(np.int64),
+        'country_id': codes[:, 4].astype(np.int64) + 1,
+        'guest_country': np.array(GUEST_COUNTRIES)[codes[:, 4]]
+    })
+
+
+class GuestPool:
+    """Codes of every guest generated so far, so repeat bookings can look up any earlier guest_id.
+    
+    This is the only generator state that grows with the dataset, at 5 bytes per guest.
+    """
     
-    booking_id = 1
-    guest_id_counter = 1
-    guest_pool = {}  # Reuse guest IDs for repeat visitors
+    def __init__(self, capacity=1024):
+        self.codes = np.empty((capacity, len(GUEST_CODES)), dtype=np.uint8)
+        self.size = 0
     
-    base_bookings_per_day = config.DATASET_BASE_BOOKINGS_PER_DAY
+    def add(self, codes):
+        if self.size + len(codes) > len(self.codes):
+            grown = np.empty((max(2 * len(self.codes), self.size + len(codes)), len(GUEST_CODES)), dtype=np.uint8)
+            grown[:self.size] = self.codes[:self.size]
+            self.codes = grown
+        self.codes[self.size:self.size + len(codes)] = codes
+        self.size += len(codes)
     
-    for date in date_range:
-        date_str = date.strftime('%Y-%m-%d')
-        
-        # Calculate booking multiplier
-        multiplier = calculate_booking_multiplier(date_str, events_by_date, weather_by_date)
-        n_bookings_today = int(base_bookings_per_day * multiplier)
-        n_bookings_today = np.clip(n_bookings_today, config.DATASET_MIN_BOOKINGS_PER_DAY, config.DATASET_MAX_BOOKINGS_PER_DAY)
-        
-        for _ in range(n_bookings_today):
-            # Select random accommodation
-            acc = accommodations_df.sample(1).iloc[0]
-            
-            # Generate or reuse guest information
-            if np.random.random() < 0.3:  # 30% chance of repeat guest
-                guest_id = np.random.choice(list(guest_pool.keys()))
-                guest_info = guest_pool[guest_id]
-                first_name = guest_info['first_name']
-                last_name = guest_info['last_name']
-                email = guest_info['email']
-                age = guest_info['age']
-                guest_country = guest_info['country']
-                country_id = guest_info['country_id']
-            else:
-                # New guest
-                first_name = np.random.choice(FIRST_NAMES)
-                last_name = np.random.choice(LAST_NAMES)
-                email = f"{first_name.lower()}.{last_name.lower()}@{np.random.choice(['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com'])}"
-                age = np.random.randint(18, 80)
-                guest_country = np.random.choice(GUEST_COUNTRIES)
-                country_id = GUEST_COUNTRIES.index(guest_country) + 1
-                guest_id = guest_id_counter
-                guest_pool[guest_id] = {
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'email': email,
-                    'age': age,
-                    'country': guest_country,
-                    'country_id': country_id
-                }
-                guest_id_counter += 1
-            
-            # Generate booking dates
-            booking_date = date
-            # Arrival can be same day or up to 90 days in future
-            days_until_arrival = np.random.randint(0, 90)
-            arrival_date = booking_date + timedelta(days=days_until_arrival)
-            # Stay duration: 1-14 nights
-            stay_nights = np.random.randint(1, 14)
-            departure_date = arrival_date + timedelta(days=stay_nights)
-            
-            # Generate booking details
-            rooms_booked = np.random.randint(1, 5)
-            number_of_guests = np.random.choice(['single', 'couple', 'family', 'group'], 
-                                              p=[0.2, 0.4, 0.3, 0.1])
-            
-            # Generate pricing (based on stars and type)
-            base_rate = 50 + (acc['stars'] * 20) + np.random.randint(-20, 50)
-            average_daily_rate = max(30, base_rate) * 100  # Store as integer (price * 100)
-            
-            # Revenue per available room
-            revenue_available_room = (average_daily_rate * stay_nights) // rooms_booked
-            
-            # Timestamps
-            created_at = booking_date - timedelta(days=np.random.randint(0, 30))
-            updated_at = created_at + timedelta(days=np.random.randint(0, 5))
-            deleted_at = None if np.random.random() > 0.05 else updated_at + timedelta(days=np.random.randint(1, 30))
-            
-            booking = {
-                'id': booking_id,
-                'uuid': str(uuid.uuid4()),
-                'accommodation_id': acc['accommodation_id'],
-                'accommodation_code': acc['accommodation_code'],
-                'accommodation_name': acc['accommodation_name'],
-                'address': acc['address'],
-                'stars': acc['stars'],
-                'capacity_type': acc['capacity_type'],
-                'accommodation_units': acc['accommodation_units'],
-                'type': acc['type'],
-                'guest_id': guest_id,
-                'first_name': first_name,
-                'last_name': last_name,
-                'email': email,
-                'age': age,
-                'country_id': country_id,
-                'date': booking_date.strftime('%Y-%m-%d'),
-                'rooms_booked': rooms_booked,
-                'number_of_guests': number_of_guests,
-                'average_daily_rate': average_daily_rate,
-                'revenue_available_room': revenue_available_room,
-                'arrival_date': arrival_date.strftime('%Y-%m-%d'),
-                'departure_date': departure_date.strftime('%Y-%m-%d'),
-                'guest_country': guest_country,
-                'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'updated_at': updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'deleted_at': deleted_at.strftime('%Y-%m-%d %H:%M:%S') if deleted_at else None
-            }
-            
-            bookings.append(booking)
-            booking_id += 1
+    def lookup(self, guest_ids):
+        return self.codes[guest_ids - 1]
+
+
+def assign_guests(rng, n_bookings, n_known=0, repeat_rate=0.3):
+    """Guest id per booking: new guests get the next id after n_known, repeat guests reuse a uniformly drawn earlier one."""
+    is_repeat = rng.random(n_bookings) < repeat_rate
+    if n_known == 0:
+        is_repeat[:1] = False
+    new_guests = n_known + np.cumsum(~is_repeat)
     
-    df_bookings = pd.DataFrame(bookings)
-    os.makedirs(config.DATASETS_PATH, exist_ok=True)
-    df_bookings.to_csv(output_file, index=False)
-    print(f"Generated {len(df_bookings)} bookings -> {output_file}")
-    return df_bookings
+    guest_ids = new_guests.copy()
+    repeats = np.flatnonzero(is_repeat)
+    guest_ids[repeats] = (rng.random(len(repeats)) * new_guests[repeats]).astype(np.int64) + 1
+    return guest_ids, int(new_guests[-1]) if n_bookings else n_known
+
+
+def booking_frame(rng, accommodations_df, booking_days, guest_ids, guest_codes, first_id=1):
+    """Build all booking rows at once from per-booking dates, guest ids and guest codes."""
+    n = len(booking_days)
+    acc = accommodations_df.iloc[rng.integers(0, len(accommodations_df), n)].reset_index(drop=True)
+    guest = guest_frame(guest_codes)
+    
+    arrival_days = booking_days + rng.integers(0, 90, n).astype('timedelta64[D]')
+    stay_nights = rng.integers(1, 14, n)
+    departure_days = arrival_days + stay_nights.astype('timedelta64[D]')
+    
+    rooms_booked = rng.integers(1, 5, n)
+    number_of_guests = np.array(['single', 'couple', 'family', 'group'])[rng.choice(4, size=n, p=[0.2, 0.4, 0.3, 0.1])]
+    
+    base_rate = 50 + acc['stars'].values * 20 + rng.integers(-20, 50, n)
+    average_daily_rate = np.maximum(30, base_rate) * 100
+    revenue_available_room = (average_daily_rate * stay_nights) // rooms_booked
+    
+    created_days = booking_days - rng.integers(0, 30, n).astype('timedelta64[D]')
+    updated_days = created_days + rng.integers(0, 5, n).astype('timedelta64[D]')
+    is_deleted = rng.random(n) <= 0.05
+    deleted_days = updated_days + rng.integers(1, 30, n).astype('timedelta64[D]')
+    
+    return pd.DataFrame({
+        'id': np.arange(first_id, first_id + n),
+        'uuid': random_uuids(rng, n),
+        'accommodation_id': acc['accommodation_id'],
+        'accommodation_code': acc['accommodation_code'],
+        'accommodation_name': acc['accommodation_name'],
+        'address': acc['address'],
+        'stars': acc['stars'],
+        'capacity_type': acc['capacity_type'],
+        'accommodation_units': acc['accommodation_units'],
+        'type': acc['type'],
+        'guest_id': guest_ids,
+        'first_name': guest['first_name'],
+        'last_name': guest['last_name'],
+        'email': guest['email'],
+        'age': guest['age'],
+        'country_id': guest['country_id'],
+        'date': format_dates(booking_days),
+        'rooms_booked': rooms_booked,
+        'number_of_guests': number_of_guests,
+        'average_daily_rate': average_daily_rate,
+        'revenue_available_room': revenue_available_room,
+        'arrival_date': format_dates(arrival_days),
+        'departure_date': format_dates(departure_days),
+        'guest_country': guest['guest_country'],
+        'created_at': format_timestamps(created_days),
+        'updated_at': format_timestamps(updated_days),
+        'deleted_at': pd.Series(format_timestamps(deleted_days)).where(is_deleted)
+    })
+
+
+def iter_shards(accommodations_df, dates, counts, seed=config.RANDOM_STATE, shard_days=config.GENERATION_SHARD_DAYS):
+    """Shard inputs for consecutive blocks of shard_days dates, produced lazily in date order.
+    
+    The repeat-guest pool spans shards, so guest ids and guest codes come from one
+    stream drawn here, shard by shard; each shard then draws everything else from
+    its own stream. The layout depends only on the dates, never on the worker count.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    starts = range(0, len(dates), shard_days)
+    guest_seed, *shard_seeds = root.spawn(len(starts) + 1)
+    guest_rng = np.random.default_rng(guest_seed)
+    pool = GuestPool()
+    first_id = 1
+    for shard_seed, start in zip(shard_seeds, starts):
+        booking_days = np.repeat(dates[start:start + shard_days], counts[start:start + shard_days])
+        guest_ids, n_guests = assign_guests(guest_rng, len(booking_days), pool.size)
+        pool.add(generate_guests(guest_rng, n_guests - pool.size))
+        yield shard_seed, accommodations_df, booking_days, guest_ids, pool.lookup(guest_ids), first_id
+        first_id += len(booking_days)
+
+
+def generate_shard(shard):
+    """Build one shard's rows from its own seed stream; runs in a worker process."""
+    seed, accommodations_df, booking_days, guest_ids, guest_codes, first_id = shard
+    return booking_frame(np.random.default_rng(seed), accommodations_df, booking_days, guest_ids, guest_codes, first_id)
+
+
+def bounded_map(executor, fn, items, window):
+    """Ordered executor.map that keeps at most window tasks in flight, so finished shards never pile up in memory."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def booking_batches(accommodations_df, seed=config.RANDOM_STATE, workers=1, scale=config.DATASET_SCALE,
+                    span=config.DATASET_SPAN_SCALE, batch_size=config.GENERATION_BATCH_SIZE):
+    events_by_date, weather_by_date = load_correlations(scale)
+    dates = dataset_dates(span)
+    counts = daily_booking_counts(dates, events_by_date, weather_by_date, scale)
+    shards = iter_shards(accommodations_df, dates, counts, seed, max(1, int(config.GENERATION_SHARD_DAYS / scale)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from rebatch(bounded_map(executor, generate_shard, shards, 2 * workers), batch_size)
+    else:
+        yield from rebatch(map(generate_shard, shards), batch_size)
+
+
+def generate_bookings(accommodations_df, seed=config.RANDOM_STATE, workers=1, scale=config.DATASET_SCALE,
+                      span=config.DATASET_SPAN_SCALE, fmt=config.GENERATION_FORMAT):
+    print("Generating bookings...")
+    output_file, n_rows = write_dataset('bookings', booking_batches(accommodations_df, seed, workers, scale, span), fmt)
+    print(f"Generated {n_rows} bookings -> {output_file}")
+    return n_rows
 
 
 def main():
@@ -304,13 +408,43 @@ def main():
     parser.add_argument(
         '--n-accommodations',
         type=int,
-        default=config.DATASET_N_ACCOMMODATIONS,
-        help=f'Number of accommodations (default: {config.DATASET_N_ACCOMMODATIONS})'
+        default=None,
+        help=f'Number of accommodations (default: {config.DATASET_N_ACCOMMODATIONS} x scale)'
+    )
+    parser.add_argument(
+        '--scale',
+        type=float,
+        default=config.DATASET_SCALE,
+        help=f'Volume multiplier for accommodations and bookings per day (default: {config.DATASET_SCALE})'
+    )
+    parser.add_argument(
+        '--span',
+        type=float,
+        default=config.DATASET_SPAN_SCALE,
+        help=f'Date span multiplier (default: {config.DATASET_SPAN_SCALE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=config.GENERATION_WORKERS,
+        help=f'Worker processes for sharded generation (default: {config.GENERATION_WORKERS})'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=config.RANDOM_STATE,
+        help=f'Random seed for the bookings (default: {config.RANDOM_STATE})'
+    )
+    parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default=config.GENERATION_FORMAT,
+        help=f'Output format (default: {config.GENERATION_FORMAT})'
     )
     
     args = parser.parse_args()
-    accommodations_df = generate_accommodations(args.n_accommodations)
-    generate_bookings(accommodations_df)
+    accommodations_df = generate_accommodations(args.n_accommodations, args.seed, args.scale)
+    generate_bookings(accommodations_df, args.seed, args.workers, args.scale, args.span, args.format)
 
 
 if __name__ == '__main__':
@@ -12,15 +12,13 @@ Generates realistic bus_schedules.csv for Amsterdam GVB routes with:
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import argparse
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-
-# Set random seed for reproducibility
-np.random.seed(config.RANDOM_STATE)
+from scaling import dataset_dates
+from writer import rebatch, write_dataset
 
 # Real GVB bus routes in Amsterdam
 GVB_ROUTES = [
@@ -131,87 +129,116 @@ SCHEDULE_PATTERNS = {
 }
 
 
-def generate_bus_schedules():
-    output_file = os.path.join(config.DATASETS_PATH, 'bus_schedules.csv')
-    start_date = datetime.strptime(config.DATASET_START_DATE, '%Y-%m-%d')
-    end_date = datetime.strptime(config.DATASET_END_DATE, '%Y-%m-%d')
-    print("Generating bus schedules...")
-    schedules = []
-    trip_id = 1
+def time_slots(patterns):
+    """Trip start times for one day, in minutes after midnight."""
+    time_slots = []
+    for pattern_name, (start_hour, end_hour, frequency) in patterns.items():
+        current_hour = start_hour
+        current_minute = 30 if start_hour == OPERATING_HOURS['start'] else 0
+        while True:
+            if end_hour == 0:
+                # Late night service runs until 00:30
+                if current_hour >= 23 and current_minute >= 30:
+                    break
+            else:
+                if current_hour >= end_hour:
+                    break
+            time_slots.append(current_hour * 60 + current_minute)
+            current_minute += frequency
+            if current_minute >= 60:
+                current_minute -= 60
+                current_hour += 1
+                if current_hour >= 24:
+                    current_hour = 0
+    return np.array(time_slots, dtype=np.int64)
+
+
+STOP_IDS = sorted({stop['stop_id'] for route in GVB_ROUTES for stop in route['stops']})
+STOP_NAMES = {stop['stop_id']: f"{stop['stop_name']}, Amsterdam" for route in GVB_ROUTES for stop in route['stops']}
+ROUTE_IDS = [route['route_id'] for route in GVB_ROUTES]
+TIME_LABELS = np.array([f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)])
+
+
+def day_template(patterns):
+    """One day's timetable for every route, sorted by route, time and stop.
+    
+    Trips are numbered per route and slot in generation order; each stop is
+    reached 4 minutes after the previous one.
+    """
+    slots = time_slots(patterns)
+    parts = []
+    trip_offset = 0
+    for route_index, route in enumerate(GVB_ROUTES):
+        n_stops = len(route['stops'])
+        stop_codes = np.array([STOP_IDS.index(stop['stop_id']) for stop in route['stops']])
+        parts.append(pd.DataFrame({
+            'trip_offset': trip_offset + np.repeat(np.arange(len(slots)), n_stops),
+            'minute': (np.repeat(slots, n_stops) + np.tile(np.arange(n_stops) * 4, len(slots))) % (24 * 60),
+            'route': route_index,
+            'stop': np.tile(stop_codes, len(slots))
+        }))
+        trip_offset += len(slots)
     
-    current_date = start_date
-    date_range = []
-    while current_date <= end_date:
-        date_range.append(current_date)
-        current_date += timedelta(days=1)
+    template = pd.concat(parts, ignore_index=True).sort_values(['route', 'minute', 'stop'], ignore_index=True)
+    return template, trip_offset
+
+
+def bus_schedule_frame(dates, weekday, weekend, first_trip_id=1):
+    """Tile the weekday and weekend (template, trips) pairs over dates; rows come out already sorted."""
+    weekday_template, weekday_trips = weekday
+    weekend_template, weekend_trips = weekend
+    templates = pd.concat([weekday_template, weekend_template], ignore_index=True)
     
-    for date in date_range:
-        date_str = date.strftime('%Y-%m-%d')
-        day_of_week = date.weekday()
-        is_weekend = day_of_week >= 5
-        
-        patterns = SCHEDULE_PATTERNS['weekend' if is_weekend else 'weekday']
-        time_slots = []
-        for pattern_name, (start_hour, end_hour, frequency) in patterns.items():
-            current_hour = start_hour
-            current_minute = 30 if start_hour == OPERATING_HOURS['start'] else 0
-            while True:
-                if end_hour == 0:
-                    if current_hour >= 23 and current_minute >= 30:
-                        break
-                else:
-                    if current_hour >= end_hour:
-                        break
-                time_str = f"{current_hour:02d}:{current_minute:02d}"
-                time_slots.append(time_str)
-                current_minute += frequency
-                if current_minute >= 60:
-                    current_minute -= 60
-                    current_hour += 1
-                    if current_hour >= 24:
-                        current_hour = 0
-        
-        # Generate trips for each route
-        for route in GVB_ROUTES:
-            for time_slot in time_slots:
-                # Each trip visits all stops in sequence
-                for stop_idx, stop_info in enumerate(route['stops']):
-                    # Calculate arrival time at this stop (add travel time)
-                    # Assume ~3-5 minutes between stops
-                    arrival_minutes = int(time_slot.split(':')[1]) + (stop_idx * 4)
-                    arrival_hours = int(time_slot.split(':')[0])
-                    
-                    if arrival_minutes >= 60:
-                        arrival_minutes -= 60
-                        arrival_hours += 1
-                        if arrival_hours >= 24:
-                            arrival_hours = 0
-                    
-                    arrival_time = f"{arrival_hours:02d}:{arrival_minutes:02d}"
-                    
-                    schedules.append({
-                        'trip_id': trip_id,
-                        'date': date_str,
-                        'time': arrival_time,
-                        'route_id': route['route_id'],
-                        'stop_id': stop_info['stop_id'],
-                        'stop_name': f"{stop_info['stop_name']}, Amsterdam"
-                    })
-                trip_id += 1
+    is_weekend = (dates.astype('datetime64[D]').view('int64') - 4) % 7 >= 5
+    rows_per_day = np.where(is_weekend, len(weekend_template), len(weekday_template))
+    trips_per_day = np.where(is_weekend, weekend_trips, weekday_trips)
+    template_start = np.where(is_weekend, len(weekday_template), 0)
     
-    df_schedules = pd.DataFrame(schedules)
-    df_schedules = df_schedules.sort_values(['date', 'route_id', 'time', 'stop_id'])
-    os.makedirs(config.DATASETS_PATH, exist_ok=True)
-    df_schedules.to_csv(output_file, index=False)
-    print(f"Generated {len(df_schedules)} schedule entries -> {output_file}")
-    return df_schedules
+    day = np.repeat(np.arange(len(dates)), rows_per_day)
+    day_row_start = np.cumsum(rows_per_day) - rows_per_day
+    row = np.repeat(template_start - day_row_start, rows_per_day) + np.arange(len(day))
+    first_trip = np.cumsum(trips_per_day) - trips_per_day + first_trip_id
+    
+    stop_codes = templates['stop'].values[row]
+    return pd.DataFrame({
+        'trip_id': first_trip[day] + templates['trip_offset'].values[row],
+        'date': pd.Categorical.from_codes(day, np.datetime_as_string(dates, unit='D')),
+        'time': pd.Categorical.from_codes(templates['minute'].values[row], TIME_LABELS),
+        'route_id': pd.Categorical.from_codes(templates['route'].values[row], ROUTE_IDS),
+        'stop_id': pd.Categorical.from_codes(stop_codes, STOP_IDS),
+        'stop_name': pd.Categorical.from_codes(stop_codes, [STOP_NAMES[stop_id] for stop_id in STOP_IDS])
+    })
+
+
+def bus_schedule_blocks(dates, rows_per_block):
+    """Timetable frames of whole days, about rows_per_block rows each, with trip ids continuing across frames."""
+    weekday = day_template(SCHEDULE_PATTERNS['weekday'])
+    weekend = day_template(SCHEDULE_PATTERNS['weekend'])
+    days_per_block = max(1, rows_per_block // len(weekday[0]))
+    first_trip_id = 1
+    for start in range(0, len(dates), days_per_block):
+        frame = bus_schedule_frame(dates[start:start + days_per_block], weekday, weekend, first_trip_id)
+        first_trip_id = int(frame['trip_id'].max()) + 1
+        yield frame
+
+
+def bus_schedule_batches(span=config.DATASET_SPAN_SCALE, batch_size=config.GENERATION_BATCH_SIZE):
+    return rebatch(bus_schedule_blocks(dataset_dates(span), batch_size), batch_size)
+
+
+def generate_bus_schedules(span=config.DATASET_SPAN_SCALE):
+    print("Generating bus schedules...")
+    output_file, n_rows = write_dataset('bus_schedules', bus_schedule_batches(span), 'csv')
+    print(f"Generated {n_rows} schedule entries -> {output_file}")
+    return n_rows
 
 
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description='Generate Amsterdam bus schedules dataset')
-    parser.parse_args()
-    generate_bus_schedules()
+    parser.add_argument('--span', type=float, default=config.DATASET_SPAN_SCALE, help=f'Date span multiplier (default: {config.DATASET_SPAN_SCALE})')
+    args = parser.parse_args()
+    generate_bus_schedules(args.span)
 
 
 if __name__ == '__main__':
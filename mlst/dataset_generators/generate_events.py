@@ -9,7 +9,6 @@ Generates realistic events.csv for Amsterdam with:
 - Date range: November 2023 - November 2025
 """
 
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import argparse
@@ -17,9 +16,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-
-# Set random seed for reproducibility
-np.random.seed(config.RANDOM_STATE)
+from scaling import scaled_end_date
+from writer import FORMATS, record_batches, write_dataset
 
 # Amsterdam-specific venues
 AMSTERDAM_VENUES = {
@@ -76,12 +74,21 @@ ADE_WEEKS = {
 }
 
 
-def generate_events():
-    output_file = os.path.join(config.DATASETS_PATH, 'events.csv')
+def reference_date(date):
+    """Dates after the last listed year reuse that year's major events and ADE week."""
+    last_year = max(ADE_WEEKS)
+    if date.year <= last_year:
+        return date
+    if date.month == 2 and date.day == 29:
+        return date.replace(year=last_year, day=28)
+    return date.replace(year=last_year)
+
+
+def event_records(seed=config.RANDOM_STATE, scale=config.DATASET_SCALE, span=config.DATASET_SPAN_SCALE):
+    """One row dict per event, in date and event_id order."""
     start_date = datetime.strptime(config.DATASET_START_DATE, '%Y-%m-%d')
-    end_date = datetime.strptime(config.DATASET_END_DATE, '%Y-%m-%d')
-    print("Generating events...")
-    events = []
+    end_date = datetime.strptime(str(scaled_end_date(span)), '%Y-%m-%d')
+    rng = np.random.default_rng(seed)
     event_id = 1
     
     current_date = start_date
@@ -96,14 +103,15 @@ def generate_events():
         is_weekend = day_of_week >= 5
         month = date.month
         is_summer = 6 <= month <= 8  # June, July, August
-        year = date.year
+        reference = reference_date(date)
+        reference_str = reference.strftime('%Y-%m-%d')
+        year = reference.year
         
-        is_major_event_day = date_str in MAJOR_EVENTS
+        is_major_event_day = reference_str in MAJOR_EVENTS
         if year in ADE_WEEKS:
             ade_start = datetime.strptime(ADE_WEEKS[year]['start'], '%Y-%m-%d')
             ade_end = datetime.strptime(ADE_WEEKS[year]['end'], '%Y-%m-%d')
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            is_ade_week = ade_start <= date_obj <= ade_end
+            is_ade_week = ade_start <= reference <= ade_end
         else:
             is_ade_week = False
         
@@ -125,41 +133,44 @@ def generate_events():
         if is_summer:
             base_events *= 1.5
         
+        # Scaled datasets model a proportionally bigger city
+        base_events *= scale
+        
         # Generate number of events (Poisson distribution)
-        n_events = max(0, int(np.random.poisson(base_events)))
+        n_events = max(0, int(rng.poisson(base_events)))
         
         # Add major event if it's a major event day
         if is_major_event_day:
-            major = MAJOR_EVENTS[date_str]
+            major = MAJOR_EVENTS[reference_str]
             venue = major['venue']
             location = f"{venue}, Amsterdam"
             
-            events.append({
+            yield {
                 'event_id': event_id,
                 'date': date_str,
                 'type': major['type'],
                 'name': major['name'],
                 'location': location,
-                'expected_attendance': major['attendance']
-            })
+                'expected_attendance': int(major['attendance'] * scale)
+            }
             event_id += 1
             n_events -= 1  # Already added major event
         
         # Generate additional regular events
         for _ in range(n_events):
-            event_type = np.random.choice(EVENT_TYPES)
+            event_type = rng.choice(EVENT_TYPES)
             
             # Select venue based on event type
             if event_type in AMSTERDAM_VENUES:
-                venue = np.random.choice(AMSTERDAM_VENUES[event_type])
+                venue = rng.choice(AMSTERDAM_VENUES[event_type])
             else:
-                venue = np.random.choice(['City Center', 'Various Locations'])
+                venue = rng.choice(['City Center', 'Various Locations'])
             
             location = f"{venue}, Amsterdam"
             
             # Generate event name
             name_pool = EVENT_NAMES.get(event_type, ['Event'])
-            event_name = np.random.choice(name_pool)
+            event_name = rng.choice(name_pool)
             
             # Expected attendance based on event type and venue
             attendance_ranges = {
@@ -183,31 +194,38 @@ def generate_events():
             elif venue in ['RAI Amsterdam']:
                 max_att = min(max_att, 10000)
             
-            expected_attendance = np.random.randint(min_att, max_att)
+            expected_attendance = rng.integers(min_att, max_att)
             
-            events.append({
+            yield {
                 'event_id': event_id,
                 'date': date_str,
                 'type': event_type,
                 'name': event_name,
                 'location': location,
                 'expected_attendance': expected_attendance
-            })
+            }
             event_id += 1
-    
-    df_events = pd.DataFrame(events)
-    df_events = df_events.sort_values(['date', 'event_id'])
-    os.makedirs(config.DATASETS_PATH, exist_ok=True)
-    df_events.to_csv(output_file, index=False)
-    print(f"Generated {len(df_events)} events -> {output_file}")
-    return df_events
+
+
+def event_batches(seed=config.RANDOM_STATE, scale=config.DATASET_SCALE, span=config.DATASET_SPAN_SCALE, batch_size=config.GENERATION_BATCH_SIZE):
+    return record_batches(event_records(seed, scale, span), batch_size)
+
+
+def generate_events(seed=config.RANDOM_STATE, scale=config.DATASET_SCALE, span=config.DATASET_SPAN_SCALE, fmt=config.GENERATION_FORMAT):
+    print("Generating events...")
+    output_file, n_rows = write_dataset('events', event_batches(seed, scale, span), fmt)
+    print(f"Generated {n_rows} events -> {output_file}")
+    return n_rows
 
 
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description='Generate Amsterdam events dataset')
-    parser.parse_args()
-    generate_events()
+    parser.add_argument('--scale', type=float, default=config.DATASET_SCALE, help=f'Volume multiplier (default: {config.DATASET_SCALE})')
+    parser.add_argument('--span', type=float, default=config.DATASET_SPAN_SCALE, help=f'Date span multiplier (default: {config.DATASET_SPAN_SCALE})')
+    parser.add_argument('--format', choices=FORMATS, default=config.GENERATION_FORMAT, help=f'Output format (default: {config.GENERATION_FORMAT})')
+    args = parser.parse_args()
+    generate_events(scale=args.scale, span=args.span, fmt=args.format)
 
 
 if __name__ == '__main__':
@@ -10,7 +10,6 @@ Generates realistic weather.csv for Amsterdam with:
 - Date range: November 2023 - November 2025
 """
 
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import argparse
@@ -18,9 +17,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-
-# Set random seed for reproducibility
-np.random.seed(config.RANDOM_STATE)
+from scaling import scaled_end_date
+from writer import FORMATS, record_batches, write_dataset
 
 # Amsterdam climate parameters
 AMSTERDAM_CLIMATE = {
@@ -46,12 +44,11 @@ def get_season(date):
         return 'autumn'
 
 
-def generate_weather():
-    output_file = os.path.join(config.DATASETS_PATH, 'weather.csv')
+def weather_records(seed=config.RANDOM_STATE, span=config.DATASET_SPAN_SCALE):
+    """One row dict per day, in date order."""
     start_date = datetime.strptime(config.DATASET_START_DATE, '%Y-%m-%d')
-    end_date = datetime.strptime(config.DATASET_END_DATE, '%Y-%m-%d')
-    print("Generating weather...")
-    weather = []
+    end_date = datetime.strptime(str(scaled_end_date(span)), '%Y-%m-%d')
+    rng = np.random.default_rng(seed)
     
     current_date = start_date
     date_range = []
@@ -77,13 +74,13 @@ def generate_weather():
         base_temp = climate['avg_temp'] + 7 * seasonal_factor
         
         # Add daily variation
-        temp_variation = np.random.normal(0, 3)
-        temp_max = base_temp + temp_variation + np.random.uniform(2, 6)
-        temp_min = base_temp + temp_variation - np.random.uniform(2, 6)
+        temp_variation = rng.normal(0, 3)
+        temp_max = base_temp + temp_variation + rng.uniform(2, 6)
+        temp_min = base_temp + temp_variation - rng.uniform(2, 6)
         
         # Ensure min < max
         if temp_min >= temp_max:
-            temp_min = temp_max - np.random.uniform(3, 8)
+            temp_min = temp_max - rng.uniform(3, 8)
         
         # Clamp to realistic ranges for Amsterdam
         temp_max = np.clip(temp_max, climate['temp_range'][0], climate['temp_range'][1])
@@ -103,61 +100,68 @@ def generate_weather():
         
         # Precipitation
         rain_prob = climate['rain_prob']
-        is_raining = np.random.random() < rain_prob
+        is_raining = rng.random() < rain_prob
         
         if is_raining:
             # Rain amount (mm) - heavier in autumn/winter
             if season in ['autumn', 'winter']:
-                precipitation = np.random.randint(2, 25)
+                precipitation = rng.integers(2, 25)
             else:
-                precipitation = np.random.randint(1, 15)
+                precipitation = rng.integers(1, 15)
             weather_category = 'rainy'
         else:
             precipitation = 0
             # Determine weather category based on temperature and season
             if temp_max > 20:
-                weather_category = np.random.choice(['sunny', 'partly_cloudy'], p=[0.5, 0.5])
+                weather_category = rng.choice(['sunny', 'partly_cloudy'], p=[0.5, 0.5])
             elif temp_max < 5:
                 # Winter weather
-                if np.random.random() < 0.1:  # 10% chance of snow
+                if rng.random() < 0.1:  # 10% chance of snow
                     weather_category = 'snowy'
-                    precipitation = np.random.randint(1, 10)
+                    precipitation = rng.integers(1, 10)
                 else:
-                    weather_category = np.random.choice(['cloudy', 'foggy', 'windy'], p=[0.5, 0.3, 0.2])
+                    weather_category = rng.choice(['cloudy', 'foggy', 'windy'], p=[0.5, 0.3, 0.2])
             else:
                 # Moderate temperatures
-                weather_category = np.random.choice(['cloudy', 'partly_cloudy', 'sunny', 'windy'], 
+                weather_category = rng.choice(['cloudy', 'partly_cloudy', 'sunny', 'windy'], 
                                                   p=[0.4, 0.3, 0.2, 0.1])
         
         # Humidity (higher when raining, lower when sunny)
         if weather_category == 'rainy':
-            humidity = np.random.randint(climate['humidity'][0], climate['humidity'][1])
+            humidity = rng.integers(climate['humidity'][0], climate['humidity'][1])
         elif weather_category == 'sunny':
-            humidity = np.random.randint(50, climate['humidity'][1] - 10)
+            humidity = rng.integers(50, climate['humidity'][1] - 10)
         else:
-            humidity = np.random.randint(climate['humidity'][0] - 10, climate['humidity'][1])
+            humidity = rng.integers(climate['humidity'][0] - 10, climate['humidity'][1])
         
-        weather.append({
+        yield {
             'date': date_str,
             'temperature_max': temp_max_int,
             'temperature_min': temp_min_int,
             'weather_category': weather_category,
             'precipitation': precipitation,
             'humidity': humidity
-        })
-    
-    df_weather = pd.DataFrame(weather)
-    os.makedirs(config.DATASETS_PATH, exist_ok=True)
-    df_weather.to_csv(output_file, index=False)
-    print(f"Generated {len(df_weather)} weather dataset -> {output_file}")
-    return df_weather
+        }
+
+
+def weather_batches(seed=config.RANDOM_STATE, span=config.DATASET_SPAN_SCALE, batch_size=config.GENERATION_BATCH_SIZE):
+    return record_batches(weather_records(seed, span), batch_size)
+
+
+def generate_weather(seed=config.RANDOM_STATE, span=config.DATASET_SPAN_SCALE, fmt=config.GENERATION_FORMAT):
+    print("Generating weather...")
+    output_file, n_rows = write_dataset('weather', weather_batches(seed, span), fmt)
+    print(f"Generated {n_rows} weather dataset -> {output_file}")
+    return n_rows
 
 
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description='Generate Amsterdam weather dataset')
-    parser.parse_args()
-    generate_weather()
+    parser.add_argument('--span', type=float, default=config.DATASET_SPAN_SCALE, help=f'Date span multiplier (default: {config.DATASET_SPAN_SCALE})')
+    parser.add_argument('--format', choices=FORMATS, default=config.GENERATION_FORMAT, help=f'Output format (default: {config.GENERATION_FORMAT})')
+    args = parser.parse_args()
+    generate_weather(span=args.span, fmt=args.format)
 
 
 if __name__ == '__main__':
@@ -2,92 +2,100 @@
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from ingest import iter_chunks, load_dataset
+from writer import rebatch, write_dataset
 
-np.random.seed(config.RANDOM_STATE)
+def events_by_day(event_ids, event_days, first_day, n_days):
+    """Event ids grouped by day, with each day's start offset and count."""
+    day = (event_days - first_day).astype(np.int64)
+    order = np.argsort(day, kind='stable')
+    counts = np.bincount(day, minlength=n_days)
+    starts = np.cumsum(counts) - counts
+    return event_ids[order], starts, counts
 
-def generate_web_analytics():
-    bookings_file = os.path.join(config.DATASETS_PATH, 'bookings.csv')
-    events_file = os.path.join(config.DATASETS_PATH, 'events.csv')
-    output_file = os.path.join(config.DATASETS_PATH, 'web_analytics.csv')
+def sample_without_replacement(rng, pool_sizes, sample_sizes):
+    """For each row draw sample_sizes[i] distinct positions out of range(pool_sizes[i]).
     
-    print("Generating web analytics...")
+    Every candidate gets a random key; the positions with the smallest keys per
+    row form a uniformly random subset in random order, like np.random.choice.
+    """
+    row = np.repeat(np.arange(len(pool_sizes)), pool_sizes)
+    offset = np.arange(len(row)) - np.repeat(np.cumsum(pool_sizes) - pool_sizes, pool_sizes)
+    order = np.lexsort((rng.random(len(row)), row))
+    keep = offset < np.repeat(sample_sizes, pool_sizes)
+    return row[keep], offset[order][keep]
+
+def impressions_frame(rng, bookings, event_ids, starts, counts, first_day, first_id=1):
+    """Recommendation impressions for a chunk of bookings, numbered from first_id."""
+    booking_days = pd.to_datetime(bookings['date']).values.astype('datetime64[D]')
+    rec_days = booking_days - rng.integers(1, 8, len(bookings)).astype('timedelta64[D]')
+    n_recs = rng.integers(3, 8, len(bookings))
     
-    bookings = pd.read_csv(bookings_file)
-    events = pd.read_csv(events_file)
+    # Recommendations are only shown on days that have events
+    rec_day_index = (rec_days - first_day).astype(np.int64)
+    in_range = (rec_day_index >= 0) & (rec_day_index < len(counts))
+    rec_day_index = np.where(in_range, rec_day_index, 0)
+    available = np.where(in_range, counts[rec_day_index], 0)
+    shown = np.flatnonzero(available > 0)
     
-    bookings['date'] = pd.to_datetime(bookings['date'])
-    events['date'] = pd.to_datetime(events['date'])
+    booking, position = sample_without_replacement(rng, available[shown], np.minimum(n_recs[shown], available[shown]))
+    booking = shown[booking]
+    event_id = event_ids[starts[rec_day_index[booking]] + position]
     
-    analytics = []
-    recommendation_id = 1
+    day_shown = rec_days[booking]
+    weekday = (day_shown.view('int64') - 4) % 7
+    month = day_shown.astype('datetime64[M]').view('int64') % 12 + 1
+    is_weekend = weekday >= 5
+    is_summer = (month >= 6) & (month <= 8)
+    rooms_multiplier = 1.0 + (bookings['rooms_booked'].values[booking] - 1) * 0.25
     
-    events_by_date = {}
-    for date, group in events.groupby('date'):
-        events_by_date[date] = group['event_id'].tolist()
+    click_rate = 0.15 * np.where(is_weekend, 1.3, 1.0) * np.where(is_summer, 1.4, 1.0)
+    conversion_rate = 0.08 * rooms_multiplier * np.where(is_weekend, 1.2, 1.0) * np.where(is_summer, 1.3, 1.0)
+    clicked = rng.random(len(booking)) < click_rate
+    converted = clicked & (rng.random(len(booking)) < conversion_rate)
+    
+    return pd.DataFrame({
+        'recommendation_id': np.arange(first_id, first_id + len(booking)),
+        'guest_id': bookings['guest_id'].values[booking].astype(int),
+        'event_id': event_id.astype(int),
+        'date_shown': np.datetime_as_string(day_shown, unit='D'),
+        'clicked': clicked.astype(int),
+        'converted': converted.astype(int)
+    })
+
+def impression_chunks(seed=config.RANDOM_STATE, chunksize=config.GENERATION_BATCH_SIZE):
+    """Impressions for bookings read back chunksize rows at a time, so the bookings never sit in memory at once."""
+    rng = np.random.default_rng(seed)
+    events = load_dataset('events', ['event_id', 'date'])
+    if len(events) == 0:
+        return
     
-    for _, booking in bookings.iterrows():
-        booking_date = booking['date']
-        guest_id = booking['guest_id']
-        
-        rec_date = booking_date - timedelta(days=np.random.randint(1, 8))
-        rec_date_str = rec_date.strftime('%Y-%m-%d')
-        rec_datetime = pd.to_datetime(rec_date)
-        
-        if rec_datetime not in events_by_date:
-            continue
-        
-        available_events = events_by_date[rec_datetime]
-        if len(available_events) == 0:
-            continue
-        
-        day_of_week = rec_date.weekday()
-        is_weekend = day_of_week >= 5
-        month = rec_date.month
-        is_summer = 6 <= month <= 8
-        
-        n_recs = np.random.randint(3, 8)
-        recommended_events = np.random.choice(available_events, size=min(n_recs, len(available_events)), replace=False)
-        
-        rooms_booked = booking['rooms_booked']
-        rooms_multiplier = 1.0 + (rooms_booked - 1) * 0.25
-        
-        for event_id in recommended_events:
-            base_click_rate = 0.15
-            base_conversion_rate = 0.08 * rooms_multiplier
-            
-            if is_weekend:
-                base_click_rate *= 1.3
-                base_conversion_rate *= 1.2
-            
-            if is_summer:
-                base_click_rate *= 1.4
-                base_conversion_rate *= 1.3
-            
-            clicked = np.random.random() < base_click_rate
-            converted = False
-            
-            if clicked:
-                converted = np.random.random() < base_conversion_rate
-            
-            analytics.append({
-                'recommendation_id': recommendation_id,
-                'guest_id': int(guest_id),
-                'event_id': int(event_id),
-                'date_shown': rec_date_str,
-                'clicked': int(clicked),
-                'converted': int(converted)
-            })
-            recommendation_id += 1
+    event_days = events['date'].values.astype('datetime64[D]')
+    first_day = event_days.min()
+    n_days = int((event_days.max() - first_day).astype(np.int64)) + 1
+    event_ids, starts, counts = events_by_day(events['event_id'].values, event_days, first_day, n_days)
     
-    df = pd.DataFrame(analytics)
-    df.to_csv(output_file, index=False)
-    print("Web analytics generation complete.")
+    # Sampling works on every candidate event of every booking, so read fewer
+    # bookings per chunk when each day has more events to choose from
+    chunksize = max(1, int(chunksize * n_days / len(events)))
+    first_id = 1
+    for bookings in iter_chunks('bookings', ['date', 'guest_id', 'rooms_booked'], chunksize):
+        frame = impressions_frame(rng, bookings, event_ids, starts, counts, first_day, first_id)
+        first_id += len(frame)
+        yield frame
+
+def web_analytics_batches(seed=config.RANDOM_STATE, batch_size=config.GENERATION_BATCH_SIZE):
+    return rebatch(impression_chunks(seed, batch_size), batch_size)
+
+def generate_web_analytics(seed=config.RANDOM_STATE):
+    print("Generating web analytics...")
+    output_file, n_rows = write_dataset('web_analytics', web_analytics_batches(seed), 'csv')
+    print(f"Generated {n_rows} recommendation impressions -> {output_file}")
+    return n_rows
 
 if __name__ == '__main__':
     generate_web_analytics()
-
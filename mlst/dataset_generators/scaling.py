@@ -0,0 +1,29 @@
+"""
+Dataset scale helpers shared by the generators.
+
+`scale` multiplies volume (accommodations, bookings per day, events per day),
+`span` multiplies the length of the date range starting at DATASET_START_DATE.
+"""
+
+import numpy as np
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# pandas stores timestamps as nanoseconds since 1970, which ends in April 2262
+MAX_END_DATE = np.datetime64('2262-04-10')
+
+
+def scaled_end_date(span=config.DATASET_SPAN_SCALE):
+    """Last date of the dataset when the configured range is repeated `span` times."""
+    start = np.datetime64(config.DATASET_START_DATE)
+    end = np.datetime64(config.DATASET_END_DATE)
+    scaled = start + int(round((end - start + 1).astype(np.int64) * span)) - 1
+    if scaled > MAX_END_DATE:
+        raise ValueError(f"span {span} ends on {scaled}, past the last date pandas can represent ({MAX_END_DATE})")
+    return scaled
+
+
+def dataset_dates(span=config.DATASET_SPAN_SCALE):
+    return np.arange(np.datetime64(config.DATASET_START_DATE), scaled_end_date(span) + 1)
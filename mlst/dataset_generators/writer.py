@@ -0,0 +1,115 @@
+"""
+Streaming output shared by the dataset generators.
+
+Every generator exposes a `*_batches(..., batch_size)` function that yields
+DataFrames of at most `batch_size` rows in output order. `write_dataset`
+appends each batch to the output file as soon as it is produced, so memory
+is bounded by a batch rather than by the dataset.
+
+Formats:
+- csv: the default; one header, then appended rows
+- parquet: typed with the ingest schemas, i.e. the same file `ingest.py`
+  converts CSVs into, so the analytics loaders read it directly
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import sys
+import shutil
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from ingest import SCHEMAS, deltas_path
+
+FORMATS = ['csv', 'parquet']
+
+
+def output_path(name, fmt=config.GENERATION_FORMAT):
+    return os.path.join(config.DATASETS_PATH, f'{name}.{fmt}')
+
+
+def record_batches(records, batch_size=config.GENERATION_BATCH_SIZE):
+    """Group an iterator of row dicts into DataFrames of batch_size rows."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def rebatch(frames, batch_size=config.GENERATION_BATCH_SIZE):
+    """Cut an iterator of DataFrames of any size into DataFrames of batch_size rows."""
+    pending = []
+    n_pending = 0
+    for frame in frames:
+        while len(frame) > 0:
+            take = min(batch_size - n_pending, len(frame))
+            pending.append(frame.iloc[:take])
+            n_pending += take
+            frame = frame.iloc[take:]
+            if n_pending == batch_size:
+                yield pd.concat(pending, ignore_index=True)
+                pending = []
+                n_pending = 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def typed_batch(name, batch):
+    """Cast a batch to the ingest schema of `name`; datasets without one keep their dtypes."""
+    schema = SCHEMAS.get(name, {})
+    batch = batch.copy()
+    for column, dtype in schema.items():
+        if column not in batch.columns:
+            continue
+        if dtype.startswith('datetime'):
+            batch[column] = pd.to_datetime(batch[column])
+        else:
+            batch[column] = batch[column].astype(dtype)
+    return batch
+
+
+def write_dataset(name, batches, fmt=config.GENERATION_FORMAT):
+    """Append batches to DATASETS_PATH/<name>.<fmt> as they arrive; returns (path, rows written).
+    
+    Rows go to a temporary file that replaces the output at the end, so readers
+    never see a half-written dataset. A copy in the other format is removed so
+    loaders cannot pick up stale data, and so are parquet delta files left by
+    incremental appends.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    
+    path = output_path(name, fmt)
+    tmp_path = path + '.tmp'
+    os.makedirs(config.DATASETS_PATH, exist_ok=True)
+    
+    n_rows = 0
+    parquet_writer = None
+    try:
+        for batch in batches:
+            if fmt == 'csv':
+                batch.to_csv(tmp_path, mode='a' if n_rows else 'w', header=not n_rows, index=False)
+            else:
+                table = pa.Table.from_pandas(typed_batch(name, batch), preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(tmp_path, table.schema)
+                parquet_writer.write_table(table.cast(parquet_writer.schema))
+            n_rows += len(batch)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    
+    if n_rows == 0:
+        open(tmp_path, 'w').close()
+    os.replace(tmp_path, path)
+    
+    for other in FORMATS:
+        if other != fmt and os.path.exists(output_path(name, other)):
+            os.remove(output_path(name, other))
+    shutil.rmtree(deltas_path(name), ignore_errors=True)
+    return path, n_rows
@@ -0,0 +1,103 @@
+import duckdb
+import os
+from ingest import SCHEMAS, columnar_files, columnar_is_current, csv_path
+from preprocess import build_features
+from personas import cluster_guests
+from impact import impact_summary
+import config
+
+SQL_TYPES = {'int64': 'BIGINT', 'str': 'VARCHAR', 'datetime64[ns]': 'TIMESTAMP'}
+
+def connect():
+    connection = duckdb.connect()
+    connection.execute(f"SET threads TO {config.DUCKDB_THREADS}")
+    for name, schema in SCHEMAS.items():
+        if columnar_is_current(name):
+            files = ', '.join(f"'{path}'" for path in columnar_files(name))
+            source = f"read_parquet([{files}])"
+        elif os.path.exists(csv_path(name)):
+            columns = ', '.join(f"'{column}': '{SQL_TYPES[dtype]}'" for column, dtype in schema.items())
+            source = f"read_csv('{csv_path(name)}', header = true, columns = {{{columns}}})"
+        else:
+            continue
+        connection.execute(f"CREATE VIEW {name} AS SELECT * FROM {source}")
+    return connection
+
+def preprocess(connection=None):
+    connection = connection or connect()
+
+    daily = connection.execute("""
+        SELECT
+            date,
+            CAST(SUM(rooms_booked) AS BIGINT) AS rooms_booked,
+            CAST(SUM(revenue_available_room) AS BIGINT) AS revenue_available_room,
+            CAST(SUM(accommodation_units) AS BIGINT) AS accommodation_units
+        FROM bookings
+        GROUP BY date
+        ORDER BY date
+    """).df()
+
+    event_intensity = connection.execute("""
+        SELECT date, CAST(SUM(expected_attendance) AS BIGINT) AS event_intensity
+        FROM events
+        GROUP BY date
+        ORDER BY date
+    """).df()
+
+    weather = connection.execute("""
+        SELECT date, precipitation, temperature_max
+        FROM weather
+    """).df()
+
+    return build_features(daily, event_intensity, weather)
+
+def create_personas(connection=None):
+    connection = connection or connect()
+
+    guests = connection.execute("""
+        SELECT
+            guest_id,
+            arg_min(age, id) AS age,
+            CAST(SUM(average_daily_rate) AS BIGINT) / COUNT(average_daily_rate) AS average_daily_rate,
+            CAST(SUM(rooms_booked) AS BIGINT) AS rooms_booked,
+            arg_min(country_id, id) AS country_id
+        FROM bookings
+        GROUP BY guest_id
+        ORDER BY guest_id
+    """).df()
+
+    return cluster_guests(guests)
+
+def measure_impact(recommendations, connection=None):
+    connection = connection or connect()
+
+    if len(recommendations) == 0:
+        avg_without = connection.execute("SELECT AVG(rooms_booked) FROM bookings").fetchone()[0]
+        return {
+            'conversion_rate': 0.0,
+            'avg_bookings_with_recommendations': 0.0,
+            'avg_bookings_without_recommendations': avg_without,
+            'improvement': 0.0
+        }
+
+    recommendation_dates = recommendations[['date']].drop_duplicates()
+    connection.register('recommendation_dates', recommendation_dates)
+    totals = connection.execute("""
+        SELECT
+            date IN (SELECT date FROM recommendation_dates) AS with_recs,
+            COUNT(*) AS bookings,
+            CAST(SUM(rooms_booked) AS BIGINT) AS rooms
+        FROM bookings
+        GROUP BY with_recs
+    """).df().set_index('with_recs')
+    connection.unregister('recommendation_dates')
+
+    def average(with_recs):
+        if with_recs not in totals.index:
+            return 0
+        return totals.loc[with_recs, 'rooms'] / totals.loc[with_recs, 'bookings']
+
+    bookings_with_recs = totals.loc[True, 'bookings'] if True in totals.index else 0
+    conversion_rate = bookings_with_recs / len(recommendations)
+
+    return impact_summary(conversion_rate, average(True), average(False))
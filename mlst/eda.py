@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from cube import rollup
+
+def daily_series(df):
+    return df.sort_values('date')[['date', 'demand', 'revpar', 'occupancy']]
+
+def demand_over_time(df):
+    return df.sort_values('date')[['date', 'demand']]
+
+def monthly_demand(df):
+    monthly = df.groupby(df['date'].dt.month)['demand'].mean()
+    return monthly.rename_axis('month').rename('avg_demand').reset_index()
+
+def revpar_histogram(df, bins=40):
+    counts, edges = np.histogram(df['revpar'].dropna(), bins=bins)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+def temperature_demand(df):
+    return df[['date', 'temperature_max', 'demand']]
+
+def demand_by_event_intensity(df):
+    grouped = df.groupby('event_intensity')['demand']
+    stats = grouped.quantile([0, 0.25, 0.5, 0.75, 1]).unstack()
+    stats.columns = ['min', 'q1', 'median', 'q3', 'max']
+    stats['count'] = grouped.size()
+    return stats.reset_index()
+
+def segment_breakdown(cube, by, **filters):
+    segments = rollup(cube, [by], **filters)
+    if by in cube.columns and isinstance(cube[by].dtype, pd.CategoricalDtype):
+        segments[by] = segments[by].astype(str)
+    return segments
@@ -1,16 +1,26 @@
 from prophet import Prophet
 import pandas as pd
+from metrics import span
 import config
 
-def train_forecast(df, target='demand', periods=config.DEFAULT_FORECAST_PERIODS):
+def prophet_frame(df, target):
     df_prophet = df[['date', target, 'event_intensity', 'rain_flag', 'temperature_max']].copy()
     df_prophet.columns = ['ds', 'y', 'event_intensity', 'rain_flag', 'temperature_max']
+    return df_prophet
+
+def fit_forecast_model(df, target='demand'):
+    df_prophet = prophet_frame(df, target)
     
     model = Prophet()
     model.add_regressor('event_intensity')
     model.add_regressor('rain_flag')
     model.add_regressor('temperature_max')
-    model.fit(df_prophet)
+    with span(f'forecast.fit.{target}'):
+        model.fit(df_prophet)
+    return model
+
+def predict_forecast(model, df, target='demand', periods=config.DEFAULT_FORECAST_PERIODS):
+    df_prophet = prophet_frame(df, target)
     
     future = model.make_future_dataframe(periods=periods)
     future = future.merge(df_prophet[['ds', 'event_intensity', 'rain_flag', 'temperature_max']], on='ds', how='left')
@@ -18,6 +28,10 @@ def train_forecast(df, target='demand', periods=config.DEFAULT_FORECAST_PERIODS)
     future['rain_flag'] = future['rain_flag'].fillna(0)
     future['temperature_max'] = future['temperature_max'].fillna(df_prophet['temperature_max'].mean())
     
-    forecast = model.predict(future)
-    return model, forecast
+    with span(f'forecast.predict.{target}'):
+        return model.predict(future)
 
+def train_forecast(df, target='demand', periods=config.DEFAULT_FORECAST_PERIODS):
+    model = fit_forecast_model(df, target)
+    forecast = predict_forecast(model, df, target, periods)
+    return model, forecast
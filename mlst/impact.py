@@ -1,4 +1,6 @@
 import pandas as pd
+from datetime import timedelta
+import config
 
 def measure_impact(bookings, recommendations):
     if len(recommendations) == 0:
@@ -18,6 +20,13 @@ def measure_impact(bookings, recommendations):
     avg_bookings_with = bookings_with_recs['rooms_booked'].mean() if len(bookings_with_recs) > 0 else 0
     avg_bookings_without = bookings_without_recs['rooms_booked'].mean() if len(bookings_without_recs) > 0 else 0
     
+    return impact_summary(conversion_rate, avg_bookings_with, avg_bookings_without)
+
+def impact_window(daily, days=config.DEFAULT_RECOMMENDATION_DAYS):
+    end_date = daily['date'].max().date()
+    return end_date - timedelta(days=days), end_date
+
+def impact_summary(conversion_rate, avg_bookings_with, avg_bookings_without):
     if avg_bookings_without > 0:
         improvement = (avg_bookings_with - avg_bookings_without) / avg_bookings_without * 100
     else:
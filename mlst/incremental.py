@@ -0,0 +1,180 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import shutil
+import os
+from ingest import SCHEMAS, columnar_files, columnar_path, csv_path, delta_files, deltas_path, iter_chunks, load_dataset, source_files
+from preprocess import DAILY_COLUMNS, build_features, fold_daily_sums
+import config
+
+TABLE_COLUMNS = ['date'] + DAILY_COLUMNS + ['event_intensity', 'precipitation', 'temperature_max']
+
+def aggregates_path():
+    return os.path.join(config.DATASETS_PATH, config.DAILY_AGGREGATES_FILE)
+
+def aggregates_are_current():
+    path = aggregates_path()
+    if not os.path.exists(path):
+        return False
+    sources = [path for name in ['bookings', 'events', 'weather'] for path in source_files(name)]
+    return all(os.path.getmtime(path) >= os.path.getmtime(source) for source in sources)
+
+def empty_table():
+    table = pd.DataFrame({column: pd.Series(dtype='Int64') for column in TABLE_COLUMNS})
+    table['date'] = pd.Series(dtype='datetime64[us]')
+    return table
+
+def read_table():
+    if not os.path.exists(aggregates_path()):
+        return empty_table()
+    return pd.read_parquet(aggregates_path())
+
+def write_table(table):
+    os.makedirs(os.path.dirname(aggregates_path()), exist_ok=True)
+    tmp_path = aggregates_path() + '.tmp'
+    table.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, aggregates_path())
+
+def merge_delta(table, delta, columns, add=True):
+    if len(delta) == 0:
+        return table
+
+    table = table.set_index('date')
+    delta = delta.set_index('date')
+    dates = delta.index
+    if add:
+        updated = table.reindex(dates)[columns].fillna(0) + delta[columns].astype('Int64')
+    else:
+        updated = delta[columns].astype('Int64')
+
+    table = table.reindex(table.index.union(dates))
+    table.loc[dates, columns] = updated
+    return table.rename_axis('date').reset_index()
+
+def booking_totals(bookings):
+    bookings = bookings[['date'] + DAILY_COLUMNS].copy()
+    bookings['date'] = pd.to_datetime(bookings['date'])
+    return bookings.groupby('date')[DAILY_COLUMNS].sum().reset_index()
+
+def event_totals(events):
+    events = events[['date', 'expected_attendance']].copy()
+    events['date'] = pd.to_datetime(events['date'])
+    totals = events.groupby('date')['expected_attendance'].sum().reset_index()
+    totals.columns = ['date', 'event_intensity']
+    return totals
+
+def weather_rows(weather):
+    weather = weather[['date', 'precipitation', 'temperature_max']].copy()
+    weather['date'] = pd.to_datetime(weather['date'])
+    return weather.drop_duplicates('date', keep='last')
+
+def build_aggregates():
+    table = empty_table()
+    table = merge_delta(table, fold_daily_sums(iter_chunks('bookings', ['date'] + DAILY_COLUMNS), DAILY_COLUMNS), DAILY_COLUMNS)
+    table = merge_delta(table, event_totals(load_dataset('events', ['date', 'expected_attendance'])), ['event_intensity'])
+    table = merge_delta(table, weather_rows(load_dataset('weather', config.WEATHER_ANALYTICS_COLUMNS)), ['precipitation', 'temperature_max'], add=False)
+    write_table(table)
+    print(f"Built daily aggregates for {len(table)} dates -> {aggregates_path()}")
+    return table
+
+def append_bookings(bookings):
+    write_table(merge_delta(read_table(), booking_totals(bookings), DAILY_COLUMNS))
+
+def append_events(events):
+    write_table(merge_delta(read_table(), event_totals(events), ['event_intensity']))
+
+def append_weather(weather):
+    write_table(merge_delta(read_table(), weather_rows(weather), ['precipitation', 'temperature_max'], add=False))
+
+APPENDERS = {'bookings': append_bookings, 'events': append_events, 'weather': append_weather}
+
+def append_columnar(name, rows):
+    rows = rows.copy()
+    for column, dtype in SCHEMAS[name].items():
+        if dtype.startswith('datetime'):
+            rows[column] = pd.to_datetime(rows[column])
+    schema = pq.read_schema(columnar_path(name))
+
+    n_parts = len(delta_files(name))
+    path = os.path.join(deltas_path(name), f'part-{n_parts:06d}.parquet')
+    os.makedirs(deltas_path(name), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(rows[schema.names], preserve_index=False).cast(schema), path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+    if config.COLUMNAR_MAX_DELTA_FILES and n_parts + 1 >= config.COLUMNAR_MAX_DELTA_FILES:
+        compact_columnar(name)
+
+def compact_columnar(name):
+    paths = columnar_files(name)
+    if len(paths) == 1:
+        return
+
+    tmp_path = columnar_path(name) + '.tmp'
+    schema = pq.read_schema(columnar_path(name))
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for path in paths:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=config.CHUNK_SIZE):
+                writer.write_table(pa.Table.from_batches([batch], schema))
+    os.replace(tmp_path, columnar_path(name))
+    shutil.rmtree(deltas_path(name))
+    print(f"Compacted {len(paths) - 1} {name} delta files into {columnar_path(name)}")
+
+def append_dataset(name, rows):
+    rows = rows.reindex(columns=list(SCHEMAS[name]))
+    if os.path.exists(columnar_path(name)) and not os.path.exists(csv_path(name)):
+        append_columnar(name, rows)
+    else:
+        rows.to_csv(csv_path(name), mode='a', header=not os.path.exists(csv_path(name)), index=False)
+    return rows
+
+def append_rows(name, rows):
+    rows = append_dataset(name, rows)
+    if os.path.exists(aggregates_path()):
+        APPENDERS[name](rows)
+    else:
+        build_aggregates()
+
+def current_table():
+    return read_table() if os.path.exists(aggregates_path()) else build_aggregates()
+
+def ingest_file(name, path):
+    rows = pd.read_csv(path, usecols=list(SCHEMAS[name]))
+    append_rows(name, rows)
+    print(f"Appended {len(rows)} {name} rows and updated daily aggregates")
+
+def load_aggregates():
+    return table_features(read_table())
+
+def table_features(table):
+    daily = table.loc[table['rooms_booked'].notna(), ['date'] + DAILY_COLUMNS]
+    daily = daily.astype({column: 'int64' for column in DAILY_COLUMNS}).reset_index(drop=True)
+
+    event_intensity = table.loc[table['event_intensity'].notna(), ['date', 'event_intensity']]
+    event_intensity = event_intensity.astype({'event_intensity': 'int64'})
+
+    weather = table.loc[table['precipitation'].notna(), ['date', 'precipitation', 'temperature_max']]
+    weather = weather.astype({'precipitation': 'int64', 'temperature_max': 'int64'})
+
+    return build_features(daily, event_intensity, weather)
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the on-disk daily aggregate table')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help='Rebuild the table from the full datasets')
+    append_parser = subparsers.add_parser('append', help='Append new rows to a dataset and update affected dates')
+    append_parser.add_argument('dataset', choices=list(APPENDERS))
+    append_parser.add_argument('path', help='CSV file with the new rows')
+    compact_parser = subparsers.add_parser('compact', help='Merge appended Parquet delta files into the base file')
+    compact_parser.add_argument('dataset', choices=list(APPENDERS))
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_aggregates()
+    elif args.command == 'compact':
+        compact_columnar(args.dataset)
+    else:
+        ingest_file(args.dataset, args.path)
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,232 @@
 import pandas as pd
+import pyarrow.parquet as pq
+import argparse
+import glob
+import shutil
 import os
 import config
 
-def load_data():
-    bookings_path = os.path.join(config.DATASETS_PATH, 'bookings.csv')
-    events_path = os.path.join(config.DATASETS_PATH, 'events.csv')
-    weather_path = os.path.join(config.DATASETS_PATH, 'weather.csv')
-    
-    bookings = pd.read_csv(bookings_path) if os.path.exists(bookings_path) else pd.DataFrame()
-    events = pd.read_csv(events_path) if os.path.exists(events_path) else pd.DataFrame()
-    weather = pd.read_csv(weather_path) if os.path.exists(weather_path) else pd.DataFrame()
-    
+SCHEMAS = {
+    'bookings': {
+        'id': 'int64',
+        'uuid': 'str',
+        'accommodation_id': 'int64',
+        'accommodation_code': 'int64',
+        'accommodation_name': 'str',
+        'address': 'str',
+        'stars': 'int64',
+        'capacity_type': 'str',
+        'accommodation_units': 'int64',
+        'type': 'str',
+        'guest_id': 'int64',
+        'first_name': 'str',
+        'last_name': 'str',
+        'email': 'str',
+        'age': 'int64',
+        'country_id': 'int64',
+        'date': 'datetime64[ns]',
+        'rooms_booked': 'int64',
+        'number_of_guests': 'str',
+        'average_daily_rate': 'int64',
+        'revenue_available_room': 'int64',
+        'arrival_date': 'datetime64[ns]',
+        'departure_date': 'datetime64[ns]',
+        'guest_country': 'str',
+        'created_at': 'datetime64[ns]',
+        'updated_at': 'datetime64[ns]',
+        'deleted_at': 'datetime64[ns]'
+    },
+    'events': {
+        'event_id': 'int64',
+        'date': 'datetime64[ns]',
+        'type': 'str',
+        'name': 'str',
+        'location': 'str',
+        'expected_attendance': 'int64'
+    },
+    'weather': {
+        'date': 'datetime64[ns]',
+        'temperature_max': 'int64',
+        'temperature_min': 'int64',
+        'weather_category': 'str',
+        'precipitation': 'int64',
+        'humidity': 'int64'
+    }
+}
+
+def csv_path(name):
+    return os.path.join(config.DATASETS_PATH, f'{name}.csv')
+
+def columnar_path(name):
+    return os.path.join(config.DATASETS_PATH, f'{name}.parquet')
+
+def deltas_path(name):
+    return os.path.join(config.DATASETS_PATH, config.DELTA_DIR, name)
+
+def delta_files(name):
+    return sorted(glob.glob(os.path.join(deltas_path(name), '*.parquet')))
+
+def columnar_files(name):
+    return [columnar_path(name)] + delta_files(name)
+
+def partitions_path(name):
+    return os.path.join(config.DATASETS_PATH, config.PARTITIONED_DIR, name)
+
+def partition_path(name, year, month):
+    return os.path.join(partitions_path(name), f'year={year}', f'month={month:02d}', 'part-0.parquet')
+
+def source_files(name):
+    paths = [path for path in [csv_path(name), columnar_path(name)] if os.path.exists(path)]
+    return paths + (delta_files(name) if os.path.exists(columnar_path(name)) else [])
+
+def columnar_is_current(name):
+    path = columnar_path(name)
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(csv_path(name)) or os.path.getmtime(path) >= os.path.getmtime(csv_path(name))
+
+def partitions_are_current(name):
+    path = partitions_path(name)
+    if not os.path.isdir(path):
+        return False
+    return all(os.path.getmtime(path) >= os.path.getmtime(source) for source in source_files(name))
+
+def csv_options(name, columns):
+    schema = SCHEMAS[name]
+    date_columns = [column for column in columns if schema[column].startswith('datetime')]
+    dtypes = {column: schema[column] for column in columns if column not in date_columns}
+    return {'usecols': columns, 'dtype': dtypes, 'parse_dates': date_columns}
+
+def read_csv(name, columns=None):
+    columns = list(SCHEMAS[name]) if columns is None else columns
+    return pd.read_csv(csv_path(name), **csv_options(name, columns))[columns]
+
+def iter_chunks(name, columns=None, chunksize=config.CHUNK_SIZE):
+    columns = list(SCHEMAS[name]) if columns is None else columns
+    if columnar_is_current(name):
+        for path in columnar_files(name):
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+    elif os.path.exists(csv_path(name)):
+        for chunk in pd.read_csv(csv_path(name), chunksize=chunksize, **csv_options(name, columns)):
+            yield chunk[columns]
+
+def build_columnar(names=None):
+    names = list(SCHEMAS) if names is None else names
+    for name in names:
+        if not os.path.exists(csv_path(name)):
+            continue
+        df = read_csv(name)
+        df.to_parquet(columnar_path(name), index=False, row_group_size=config.CHUNK_SIZE)
+        shutil.rmtree(deltas_path(name), ignore_errors=True)
+        print(f"Converted {len(df)} {name} rows -> {columnar_path(name)}")
+
+def build_partitioned(names=None):
+    names = list(SCHEMAS) if names is None else names
+    for name in names:
+        df = load_dataset(name)
+        if len(df) == 0:
+            continue
+        shutil.rmtree(partitions_path(name), ignore_errors=True)
+        months = df['date'].dt.to_period('M')
+        for month, part in df.groupby(months):
+            path = partition_path(name, month.year, month.month)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part.to_parquet(path, index=False)
+        print(f"Partitioned {len(df)} {name} rows into {months.nunique()} months -> {partitions_path(name)}")
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def compact_frame(df):
+    df = df.drop(columns=[column for column in config.PII_COLUMNS if column in df.columns])
+    for column in df.columns:
+        if pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+        elif pd.api.types.is_string_dtype(df[column]) and df[column].nunique() <= config.CATEGORY_MAX_RATIO * len(df):
+            df[column] = df[column].astype('category')
+    return df
+
+def read_columnar(name, columns=None):
+    frames = [pd.read_parquet(path, columns=columns) for path in columnar_files(name)]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+def load_dataset(name, columns=None, compact=False, report=False):
+    if compact:
+        columns = [column for column in (columns or list(SCHEMAS[name])) if column not in config.PII_COLUMNS]
+
+    if columnar_is_current(name):
+        df = read_columnar(name, columns)
+    elif os.path.exists(csv_path(name)):
+        df = read_csv(name, columns)
+    else:
+        return pd.DataFrame()
+
+    if compact:
+        before = memory_mb(df)
+        df = compact_frame(df)
+        if report:
+            print(f"Compacted {name}: {before:.1f} MB -> {memory_mb(df):.1f} MB")
+    return df
+
+def memory_report(name='bookings'):
+    full = load_dataset(name)
+    compact = compact_frame(full)
+    print(f"{name}: {len(full)} rows")
+    print(f"  full:    {len(full.columns)} columns, {memory_mb(full):.1f} MB")
+    print(f"  compact: {len(compact.columns)} columns, {memory_mb(compact):.1f} MB")
+    print(compact.dtypes.to_string())
+
+def load_data(bookings_columns=None, events_columns=None, weather_columns=None, compact=False):
+    bookings = load_dataset('bookings', bookings_columns, compact, report=compact)
+    events = load_dataset('events', events_columns)
+    weather = load_dataset('weather', weather_columns)
+
     return bookings, events, weather
 
+def load_window(name, start_date, end_date, columns=None):
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+    read_columns = columns if columns is None or 'date' in columns else columns + ['date']
+
+    if partitions_are_current(name):
+        paths = [partition_path(name, month.year, month.month) for month in pd.period_range(start_date, end_date, freq='M')]
+        parts = [pd.read_parquet(path, columns=read_columns) for path in paths if os.path.exists(path)]
+        if len(parts) == 0:
+            return pd.DataFrame(columns=read_columns or list(SCHEMAS[name]))
+        df = pd.concat(parts, ignore_index=True)
+    else:
+        df = load_dataset(name, read_columns)
+        if len(df) == 0:
+            return df
+
+    df = df[(df['date'] >= start_date) & (df['date'] <= end_date)].reset_index(drop=True)
+    return df if columns is None else df[columns]
+
+def load_data_window(start_date, end_date, bookings_columns=None, events_columns=None, weather_columns=None):
+    bookings = load_window('bookings', start_date, end_date, bookings_columns)
+    events = load_window('events', start_date, end_date, events_columns)
+    weather = load_window('weather', start_date, end_date, weather_columns)
+
+    return bookings, events, weather
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert CSV datasets to the typed columnar format')
+    parser.add_argument('--partitioned', action='store_true', help='Also write month-partitioned copies for date-window reads')
+    parser.add_argument('--memory-report', action='store_true', help='Print full vs compact in-memory size instead of converting')
+    parser.add_argument('datasets', nargs='*', help=f'Datasets to convert: {", ".join(SCHEMAS)} (default: all)')
+    args = parser.parse_args()
+    unknown = set(args.datasets) - set(SCHEMAS)
+    if unknown:
+        parser.error(f'unknown datasets: {", ".join(sorted(unknown))}')
+    if args.memory_report:
+        for name in args.datasets or ['bookings']:
+            memory_report(name)
+        return
+    build_columnar(args.datasets or None)
+    if args.partitioned:
+        build_partitioned(args.datasets or None)
+
+if __name__ == '__main__':
+    main()
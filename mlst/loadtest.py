@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+import httpx
+import numpy as np
+import pandas as pd
+from ingest import load_dataset
+import config
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        path, _, weight = item.partition('=')
+        if path not in config.LOADTEST_MIX:
+            raise ValueError(f"unknown endpoint {path!r}, expected one of {', '.join(config.LOADTEST_MIX)}")
+        mix[path] = float(weight or 1)
+    return mix
+
+def guest_popularity(exponent=config.LOADTEST_ZIPF_EXPONENT):
+    counts = load_dataset('bookings', ['guest_id'])['guest_id'].value_counts()
+    weights = np.arange(1, len(counts) + 1, dtype=np.float64) ** -exponent
+    return counts.index.values, weights / weights.sum()
+
+def request_plan(mix, rate, duration, exponent=config.LOADTEST_ZIPF_EXPONENT, seed=config.RANDOM_STATE):
+    rng = np.random.default_rng(seed)
+    n = int(rate * duration)
+    offsets = np.cumsum(rng.exponential(1 / rate, n))
+    
+    templates = list(mix)
+    weights = np.array([mix[template] for template in templates], dtype=np.float64)
+    chosen = rng.choice(len(templates), n, p=weights / weights.sum())
+    
+    per_guest = any('{guest_id}' in template for template in templates)
+    if per_guest:
+        guest_ids, popularity = guest_popularity(exponent)
+        guests = rng.choice(guest_ids, n, p=popularity)
+        event_dates = load_dataset('events', ['date'])['date'].dt.date.values
+        start_dates = event_dates[rng.integers(0, len(event_dates), n)]
+    
+    plan = []
+    for i in range(n):
+        template = templates[chosen[i]]
+        params = {}
+        if '{guest_id}' in template:
+            end_date = start_dates[i] + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+            params = {'start_date': str(start_dates[i]), 'end_date': str(end_date)}
+            path = template.format(guest_id=int(guests[i]))
+        else:
+            path = template
+        plan.append((offsets[i], template, path, params))
+    return plan
+
+async def send(client, start, offset, template, path, params, results):
+    scheduled = start + offset
+    await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+    try:
+        response = await client.get(path, params=params)
+        status = response.status_code
+        ok = status < 400
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+        ok = False
+    results.append((template, time.perf_counter() - scheduled, ok, str(status)))
+
+async def run_load(base_url, plan, connections=config.LOADTEST_CONNECTIONS, timeout=config.LOADTEST_TIMEOUT):
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    results = []
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(send(client, start, *request, results) for request in plan))
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def summarize(results, elapsed):
+    df = pd.DataFrame(results, columns=['endpoint', 'latency', 'ok', 'status'])
+    rows = []
+    for endpoint, group in [*df.groupby('endpoint', sort=False), ('all', df)]:
+        latency_ms = group.loc[group['ok'], 'latency'] * 1000
+        errors = group.loc[~group['ok'], 'status'].value_counts()
+        rows.append({
+            'endpoint': endpoint,
+            'requests': len(group),
+            'errors': int(errors.sum()),
+            'error_rate': float(errors.sum() / len(group)),
+            'throughput': float(group['ok'].sum() / elapsed),
+            'p50_ms': float(latency_ms.quantile(0.50)) if len(latency_ms) else None,
+            'p95_ms': float(latency_ms.quantile(0.95)) if len(latency_ms) else None,
+            'p99_ms': float(latency_ms.quantile(0.99)) if len(latency_ms) else None,
+            'error_statuses': errors.to_dict()
+        })
+    return rows
+
+def print_summary(rows, elapsed, rate):
+    print(f"\n{'endpoint':<24} {'requests':>8} {'errors':>7} {'err %':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        latencies = ''.join(f" {row[key]:8.1f}" if row[key] is not None else f" {'-':>8}" for key in ['p50_ms', 'p95_ms', 'p99_ms'])
+        print(f"{row['endpoint']:<24} {row['requests']:8d} {row['errors']:7d} {row['error_rate'] * 100:6.1f} {row['throughput']:7.1f}{latencies}")
+    
+    total = rows[-1]
+    print(f"\nSent {total['requests']} requests in {elapsed:.1f}s ({total['requests'] / elapsed:.1f} req/s, target {rate:g})")
+    for row in rows[:-1]:
+        if row['errors']:
+            print(f"  {row['endpoint']} errors: {', '.join(f'{status} x{count}' for status, count in row['error_statuses'].items())}")
+
+@contextmanager
+def local_server(port=config.API_PORT, timeout=config.LOADTEST_STARTUP_SECONDS):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=config.PROJECT_ROOT
+    )
+    url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                httpx.get(url + '/admin/version', timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"API server exited with status {process.returncode} during startup")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"API server did not answer on {url} within {timeout}s")
+                time.sleep(0.5)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a mix of forecast, recommend and itinerary calls against the API')
+    parser.add_argument('--url', default=config.API_URL, help=f'API base URL (default: {config.API_URL})')
+    parser.add_argument('--start-server', action='store_true', help=f'Start uvicorn api:app on port {config.API_PORT} for the run and stop it afterwards')
+    parser.add_argument('--rate', type=float, default=config.LOADTEST_RATE, help=f'Target requests per second (default: {config.LOADTEST_RATE})')
+    parser.add_argument('--duration', type=float, default=config.LOADTEST_DURATION, help=f'Seconds of traffic to send (default: {config.LOADTEST_DURATION})')
+    parser.add_argument('--connections', type=int, default=config.LOADTEST_CONNECTIONS, help=f'Connection pool size (default: {config.LOADTEST_CONNECTIONS})')
+    parser.add_argument('--mix', nargs='+', metavar='ENDPOINT=WEIGHT', help=f'Endpoint weights, e.g. /recommend/{{guest_id}}=5 /forecast/demand=1 (default: {config.LOADTEST_MIX})')
+    parser.add_argument('--zipf', type=float, default=config.LOADTEST_ZIPF_EXPONENT, help=f'Guest popularity exponent (default: {config.LOADTEST_ZIPF_EXPONENT})')
+    parser.add_argument('--seed', type=int, default=config.RANDOM_STATE, help=f'Seed for arrivals, endpoints and guests (default: {config.RANDOM_STATE})')
+    parser.add_argument('--output', help='Write the per-endpoint summary as JSON')
+    args = parser.parse_args()
+    
+    try:
+        mix = parse_mix(args.mix) if args.mix else config.LOADTEST_MIX
+    except ValueError as e:
+        parser.error(str(e))
+    plan = request_plan(mix, args.rate, args.duration, args.zipf, args.seed)
+    
+    def run(url):
+        print(f"Sending {len(plan)} requests at {args.rate:g} req/s over {args.connections} connections to {url}")
+        return asyncio.run(run_load(url, plan, args.connections))
+    
+    if args.start_server:
+        with local_server() as url:
+            results, elapsed = run(url)
+    else:
+        results, elapsed = run(args.url)
+    
+    rows = summarize(results, elapsed)
+    print_summary(rows, elapsed, args.rate)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rate': args.rate, 'duration': args.duration, 'connections': args.connections, 'mix': mix,
+                       'zipf': args.zipf, 'elapsed': elapsed, 'endpoints': rows}, f, indent=2)
+        print(f"Wrote summary -> {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@ import sys
 from ingest import load_data
 import config
 
-bookings, events, weather = load_data()
+bookings, events, weather = load_data(bookings_columns=['id'], events_columns=['event_id'], weather_columns=['date'])
 if len(bookings) == 0 or len(events) == 0:
     print("No datasets available. Please generate datasets first.")
     exit(1)
@@ -14,7 +14,8 @@ def run_api():
     uvicorn.run("api:app", host="0.0.0.0", port=config.API_PORT, log_level="info")
 
 def run_dashboard():
-    subprocess.run([sys.executable, "-m", "streamlit", "run", "dashboard.py", "--server.port", str(config.DASHBOARD_PORT)])
+    script = "dashboard_client.py" if config.DASHBOARD_MODE == 'api' else "dashboard.py"
+    subprocess.run([sys.executable, "-m", "streamlit", "run", script, "--server.port", str(config.DASHBOARD_PORT)])
 
 print("\nStarting API server and dashboard...")
 threading.Thread(target=run_api, daemon=True).start()
@@ -0,0 +1,20 @@
+from contextlib import nullcontext
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+import config
+
+STAGE_SECONDS = Histogram('mlst_stage_seconds', 'Time spent in a pipeline stage', ['stage'], buckets=config.METRICS_BUCKETS)
+REQUEST_SECONDS = Histogram('mlst_request_seconds', 'API request latency', ['method', 'endpoint'], buckets=config.METRICS_BUCKETS)
+REQUESTS = Counter('mlst_requests', 'API requests by response status', ['method', 'endpoint', 'status'])
+NO_SPAN = nullcontext()
+
+def span(stage):
+    if not config.METRICS_SPANS:
+        return NO_SPAN
+    return STAGE_SECONDS.labels(stage).time()
+
+def observe_request(method, endpoint, status, seconds):
+    REQUEST_SECONDS.labels(method, endpoint).observe(seconds)
+    REQUESTS.labels(method, endpoint, str(status)).inc()
+
+def exposition():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import config
+
+def occupancy_matrix(bookings):
+    stays = bookings[bookings['deleted_at'].isna()] if 'deleted_at' in bookings.columns else bookings
+    if len(stays) == 0:
+        return pd.DataFrame(index=pd.DatetimeIndex([]), dtype=np.int64)
+    
+    arrivals = pd.to_datetime(stays['arrival_date']).values.astype('datetime64[D]')
+    departures = pd.to_datetime(stays['departure_date']).values.astype('datetime64[D]')
+    
+    first_night = arrivals.min()
+    n_nights = int((departures.max() - first_night).astype(int))
+    acc_codes, accommodation_ids = pd.factorize(stays['accommodation_id'], sort=True)
+    
+    width = n_nights + 1
+    start = acc_codes * width + (arrivals - first_night).astype(int)
+    end = acc_codes * width + (departures - first_night).astype(int)
+    rooms = stays['rooms_booked'].values.astype(np.float64)
+    
+    size = len(accommodation_ids) * width
+    diff = np.bincount(start, weights=rooms, minlength=size) - np.bincount(end, weights=rooms, minlength=size)
+    occupied = diff.reshape(len(accommodation_ids), width).cumsum(axis=1)[:, :-1].round().astype(np.int64)
+    
+    nights = pd.date_range(pd.Timestamp(first_night), periods=n_nights, freq='D')
+    return pd.DataFrame(occupied.T, index=nights, columns=accommodation_ids)
+
+def occupancy_calendar(bookings):
+    matrix = occupancy_matrix(bookings)
+    if matrix.size == 0:
+        return pd.DataFrame(columns=['date', 'accommodation_id', 'rooms_occupied', 'accommodation_units', 'occupancy_rate'])
+    
+    units = bookings.groupby('accommodation_id')['accommodation_units'].first()
+    
+    calendar = matrix.rename_axis(index='date', columns='accommodation_id').stack().rename('rooms_occupied').reset_index()
+    calendar['accommodation_units'] = calendar['accommodation_id'].map(units).values
+    calendar['occupancy_rate'] = calendar['rooms_occupied'] / calendar['accommodation_units']
+    return calendar
+
+def daily_occupancy(bookings):
+    matrix = occupancy_matrix(bookings)
+    units = bookings.groupby('accommodation_id')['accommodation_units'].first().reindex(matrix.columns)
+    
+    occupancy = pd.DataFrame({
+        'date': matrix.index,
+        'occupancy': matrix.sum(axis=1).values,
+        'occupancy_rate': matrix.sum(axis=1).values / units.sum()
+    })
+    return occupancy
+
+def trim_warmup(df, days=config.OCCUPANCY_WARMUP_DAYS):
+    trimmed = df[df['date'] >= df['date'].min() + pd.Timedelta(days=days)]
+    return trimmed if len(trimmed) > 1 else df
+
+def add_occupancy(df, bookings):
+    df = df.merge(daily_occupancy(bookings), on='date', how='left')
+    df['occupancy'] = df['occupancy'].fillna(0)
+    df['occupancy_rate'] = df['occupancy_rate'].fillna(0)
+    return df
@@ -11,6 +11,9 @@ def create_personas(bookings):
         'country_id': 'first'
     }).reset_index()
     
+    return cluster_guests(guests)
+
+def cluster_guests(guests):
     features = ['age', 'average_daily_rate', 'rooms_booked']
     X = guests[features].fillna(0)
     
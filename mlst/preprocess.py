@@ -1,22 +1,14 @@
 import pandas as pd
+from ingest import iter_chunks, load_dataset
+from metrics import span
+import config
 
-def preprocess(bookings, events, weather):
-    bookings['date'] = pd.to_datetime(bookings['date'])
-    events['date'] = pd.to_datetime(events['date'])
-    weather['date'] = pd.to_datetime(weather['date'])
-    
-    daily = bookings.groupby('date').agg({
-        'rooms_booked': 'sum',
-        'revenue_available_room': 'sum',
-        'accommodation_units': 'sum'
-    }).reset_index()
-    
+DAILY_COLUMNS = ['rooms_booked', 'revenue_available_room', 'accommodation_units']
+
+def build_features(daily, event_intensity, weather):
     daily['revpar'] = daily['revenue_available_room'] / daily['accommodation_units']
     daily['demand'] = daily['rooms_booked']
     
-    event_intensity = events.groupby('date')['expected_attendance'].sum().reset_index()
-    event_intensity.columns = ['date', 'event_intensity']
-    
     weather['rain_flag'] = (weather['precipitation'] > 0).astype(int)
     
     df = daily.merge(event_intensity, on='date', how='left')
@@ -30,3 +22,45 @@ def preprocess(bookings, events, weather):
     
     return df
 
+def preprocess(bookings, events, weather):
+    with span('preprocess.parse_dates'):
+        bookings['date'] = pd.to_datetime(bookings['date'])
+        events['date'] = pd.to_datetime(events['date'])
+        weather['date'] = pd.to_datetime(weather['date'])
+    
+    with span('preprocess.daily'):
+        daily = bookings.groupby('date').agg({
+            'rooms_booked': 'sum',
+            'revenue_available_room': 'sum',
+            'accommodation_units': 'sum'
+        }).reset_index()
+    
+    with span('preprocess.event_intensity'):
+        event_intensity = events.groupby('date')['expected_attendance'].sum().reset_index()
+        event_intensity.columns = ['date', 'event_intensity']
+    
+    with span('preprocess.features'):
+        return build_features(daily, event_intensity, weather)
+
+def fold_daily_sums(chunks, columns):
+    totals = None
+    for chunk in chunks:
+        chunk_totals = chunk.groupby('date')[columns].sum()
+        totals = chunk_totals if totals is None else pd.concat([totals, chunk_totals]).groupby(level=0).sum()
+    
+    if totals is None:
+        return pd.DataFrame(columns=['date'] + columns)
+    return totals.reset_index()
+
+def preprocess_chunked(chunksize=config.CHUNK_SIZE):
+    with span('preprocess.daily'):
+        daily = fold_daily_sums(iter_chunks('bookings', ['date'] + DAILY_COLUMNS, chunksize), DAILY_COLUMNS)
+    
+    with span('preprocess.event_intensity'):
+        event_intensity = fold_daily_sums(iter_chunks('events', ['date', 'expected_attendance'], chunksize), ['expected_attendance'])
+        event_intensity.columns = ['date', 'event_intensity']
+    
+    weather = load_dataset('weather', config.WEATHER_ANALYTICS_COLUMNS)
+    
+    with span('preprocess.features'):
+        return build_features(daily, event_intensity, weather)
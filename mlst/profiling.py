@@ -0,0 +1,145 @@
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from starlette.routing import Match
+import config
+
+profiles = defaultdict(lambda: deque(maxlen=config.PROFILE_KEEP))
+profile_lock = threading.Lock()
+
+def profile_requested(request):
+    flag = request.headers.get('x-profile') or request.query_params.get('profile')
+    if not config.PROFILE_ENABLED or flag is None or flag.lower() not in ('1', 'true', 'yes'):
+        return False
+    return random.random() < config.PROFILE_SAMPLE_RATE
+
+def matching_route(app, scope):
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+STDLIB_PATH = os.path.dirname(os.__file__)
+
+def short_path(filename):
+    if 'site-packages' + os.sep in filename:
+        return filename.split('site-packages' + os.sep)[-1]
+    for root in (config.PROJECT_ROOT, STDLIB_PATH):
+        if filename.startswith(root + os.sep):
+            return os.path.relpath(filename, root)
+    return filename
+
+def function_name(code):
+    return f"{short_path(code.co_filename)}:{code.co_firstlineno} {code.co_name}"
+
+def sample_stacks(entry_code, stop, stacks, interval=config.PROFILE_INTERVAL):
+    own = threading.get_ident()
+    while not stop.wait(interval):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            stack = []
+            while frame is not None and frame.f_code is not entry_code:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if frame is not None:
+                stacks.append(stack + [entry_code])
+
+def hot_functions(stacks):
+    self_samples = Counter(function_name(stack[0]) for stack in stacks)
+    total_samples = Counter(name for stack in stacks for name in {function_name(code) for code in stack})
+    return [{'function': name, 'self': self_samples[name], 'total': total} for name, total in total_samples.items()]
+
+def allocation_sites(before, after, limit=config.PROFILE_STORED_SITES):
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+    return [
+        {'site': f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}", 'size_kb': stat.size_diff / 1024, 'count': stat.count_diff}
+        for stat in stats[:limit]
+    ]
+
+async def profile_request(request, call_next):
+    route = matching_route(request.app, request.scope)
+    if route is None or not profile_lock.acquire(blocking=False):
+        return await call_next(request)
+    
+    started_tracing = not tracemalloc.is_tracing()
+    try:
+        if started_tracing:
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        
+        stacks = []
+        stop = threading.Event()
+        sampler = threading.Thread(target=sample_stacks, args=(route.endpoint.__code__, stop, stacks), daemon=True)
+        started_at = datetime.now().isoformat(timespec='seconds')
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            stop.set()
+            sampler.join()
+        seconds = time.perf_counter() - start
+        
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        profile_lock.release()
+    
+    profiles[route.path].append({
+        'started_at': started_at,
+        'path': request.url.path,
+        'query': str(request.query_params),
+        'status': response.status_code,
+        'seconds': seconds,
+        'samples': len(stacks),
+        'peak_mb': (peak - baseline) / 1024 ** 2,
+        'retained_mb': (current - baseline) / 1024 ** 2,
+        'allocations': allocation_sites(before, after),
+        'functions': hot_functions(stacks)
+    })
+    response.headers['X-Profiled'] = route.path
+    return response
+
+def profile_summary(endpoint=None, top=config.PROFILE_TOP):
+    summary = {}
+    for name, recorded in list(profiles.items()):
+        if endpoint is not None and name != endpoint:
+            continue
+        recorded = list(recorded)
+        n_samples = max(1, sum(profile['samples'] for profile in recorded))
+        
+        sizes, counts = Counter(), Counter()
+        for profile in recorded:
+            for row in profile['allocations']:
+                sizes[row['site']] += row['size_kb'] / len(recorded)
+                counts[row['site']] += row['count']
+        allocations = sorted(sizes, key=lambda site: -abs(sizes[site]))[:top]
+        
+        self_samples, total_samples = Counter(), Counter()
+        for profile in recorded:
+            for row in profile['functions']:
+                self_samples[row['function']] += row['self']
+                total_samples[row['function']] += row['total']
+        functions = sorted(total_samples, key=lambda function: (-self_samples[function], -total_samples[function]))[:top]
+        
+        summary[name] = {
+            'profiles': [{key: value for key, value in profile.items() if key not in ('allocations', 'functions')} for profile in recorded],
+            'allocations': [{'site': site, 'mean_size_kb': round(sizes[site], 1), 'count': counts[site]} for site in allocations],
+            'functions': [
+                {'function': function, 'self_pct': round(100 * self_samples[function] / n_samples, 1), 'total_pct': round(100 * total_samples[function] / n_samples, 1)}
+                for function in functions
+            ]
+        }
+    return summary
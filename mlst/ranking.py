@@ -0,0 +1,101 @@
+import pandas as pd
+import numpy as np
+import os
+import threading
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import SGDClassifier
+import config
+
+SEASONS = {
+    12: 'winter', 1: 'winter', 2: 'winter',
+    3: 'spring', 4: 'spring', 5: 'spring',
+    6: 'summer', 7: 'summer', 8: 'summer',
+    9: 'autumn', 10: 'autumn', 11: 'autumn'
+}
+
+def impression_features(persona_ids, event_types, dates):
+    persona = 'persona=' + pd.Series(np.asarray(persona_ids)).astype(int).astype(str)
+    event_type = 'type=' + pd.Series(np.asarray(event_types)).fillna('').astype(str)
+    dates = pd.to_datetime(pd.Series(np.asarray(dates)))
+    weekday = 'weekday=' + dates.dt.weekday.astype(str)
+    season = 'season=' + dates.dt.month.map(SEASONS)
+
+    persona_type = persona + '|' + event_type
+    type_weekday = event_type + '|' + weekday
+    type_season = event_type + '|' + season
+
+    columns = [persona, event_type, weekday, season, persona_type, type_weekday, type_season]
+    return zip(*(column.tolist() for column in columns))
+
+class CTRRanker:
+    def __init__(self, personas, events):
+        self.persona_by_guest = personas.set_index('guest_id')['persona_id']
+        events = events[['event_id', 'type', 'date']].copy()
+        events['date'] = pd.to_datetime(events['date'])
+        self.events = events.set_index('event_id')
+        self.hasher = FeatureHasher(n_features=config.CTR_HASH_FEATURES, input_type='string', alternate_sign=False)
+        self.model = SGDClassifier(
+            loss='log_loss',
+            alpha=config.CTR_ALPHA,
+            learning_rate='constant',
+            eta0=config.CTR_LEARNING_RATE,
+            random_state=config.RANDOM_STATE
+        )
+        self.n_impressions = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def guest_persona(self, guest_ids):
+        return pd.Series(guest_ids).map(self.persona_by_guest).fillna(0).values
+
+    def partial_fit(self, impressions):
+        impressions = impressions[impressions['event_id'].isin(self.events.index)]
+        if len(impressions) == 0:
+            return self
+
+        event_types = self.events.loc[impressions['event_id'], 'type'].values
+        X = self.hasher.transform(impression_features(
+            self.guest_persona(impressions['guest_id']),
+            event_types,
+            impressions['date_shown']
+        ))
+        with self.lock:
+            self.model.partial_fit(X, impressions['clicked'].astype(int).values, classes=np.array([0, 1]))
+            self.n_impressions += len(impressions)
+        return self
+
+    def fit_file(self, path, chunksize=config.CTR_CHUNK_SIZE):
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            self.partial_fit(chunk)
+        return self
+
+    def score(self, guest_id, candidates):
+        if len(candidates) == 0 or self.n_impressions == 0:
+            return np.zeros(len(candidates))
+
+        persona_ids = np.repeat(self.guest_persona([guest_id]), len(candidates))
+        X = self.hasher.transform(impression_features(persona_ids, candidates['type'], candidates['date']))
+        with self.lock:
+            return self.model.predict_proba(X)[:, 1]
+
+    def rerank(self, guest_id, candidates):
+        scores = self.score(guest_id, candidates)
+        order = np.argsort(-scores, kind='stable')
+        return candidates.iloc[order]
+
+def train_ranker(personas, events, path=None):
+    if path is None:
+        path = os.path.join(config.DATASETS_PATH, os.path.basename(config.WEB_ANALYTICS_FILE))
+
+    ranker = CTRRanker(personas, events)
+    if os.path.exists(path):
+        ranker.fit_file(path)
+    return ranker
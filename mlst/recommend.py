@@ -3,12 +3,14 @@ import numpy as np
 from datetime import datetime, timedelta
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from ingest import load_data
-from personas import create_personas
+from ingest import load_dataset, load_window
+from backend import guest_personas
+from metrics import span
 import config
 
 def collaborative_filtering(events, guest_id, bookings, n=config.DEFAULT_RECOMMENDATIONS):
-    bookings['date'] = pd.to_datetime(bookings['date'])
+    if not pd.api.types.is_datetime64_any_dtype(bookings['date']):
+        bookings = bookings.assign(date=pd.to_datetime(bookings['date']))
     events['date'] = pd.to_datetime(events['date'])
     
     guest_bookings = bookings[bookings['guest_id'] == guest_id]
@@ -21,14 +23,16 @@ def collaborative_filtering(events, guest_id, bookings, n=config.DEFAULT_RECOMME
     if len(guest_events) == 0:
         return pd.DataFrame()
     
-    user_item = bookings.groupby(['guest_id', 'date']).size().reset_index(name='count')
-    user_item = user_item.merge(events[['date', 'event_id']], on='date', how='inner')
-    user_item_matrix = user_item.pivot_table(index='guest_id', columns='event_id', values='count', fill_value=0)
+    with span('collaborative_filtering.pivot'):
+        user_item = bookings.groupby(['guest_id', 'date']).size().reset_index(name='count')
+        user_item = user_item.merge(events[['date', 'event_id']], on='date', how='inner')
+        user_item_matrix = user_item.pivot_table(index='guest_id', columns='event_id', values='count', fill_value=0)
     
     if guest_id not in user_item_matrix.index:
         return pd.DataFrame()
     
-    user_similarity = cosine_similarity(user_item_matrix.loc[[guest_id]], user_item_matrix)[0]
+    with span('collaborative_filtering.similarity'):
+        user_similarity = cosine_similarity(user_item_matrix.loc[[guest_id]], user_item_matrix)[0]
     sorted_indices = user_similarity.argsort()
     top_indices = sorted_indices[-config.SIMILAR_USERS_COUNT:]
     top_indices = top_indices[::-1]
@@ -71,13 +75,14 @@ def content_based_filtering(events, guest_id, personas, bookings, n=config.DEFAU
     if events_text.fillna('').str.strip().eq('').all():
         return events_shuffled.head(n)
     
-    vectorizer = TfidfVectorizer()
-    vectorizer.fit_transform(events_text.fillna(''))
-    
-    all_events_text = events_shuffled['type'] + ' ' + events_shuffled['name'] + ' ' + events_shuffled['location']
-    all_tfidf = vectorizer.transform(all_events_text.fillna(''))
-    
-    persona_tfidf = vectorizer.transform(persona_events['type'] + ' ' + persona_events['name'] + ' ' + persona_events['location'])
+    with span('content_based_filtering.tfidf'):
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit_transform(events_text.fillna(''))
+        
+        all_events_text = events_shuffled['type'] + ' ' + events_shuffled['name'] + ' ' + events_shuffled['location']
+        all_tfidf = vectorizer.transform(all_events_text.fillna(''))
+        
+        persona_tfidf = vectorizer.transform(persona_events['type'] + ' ' + persona_events['name'] + ' ' + persona_events['location'])
     persona_mean = persona_tfidf.mean(axis=0)
     persona_mean = np.asarray(persona_mean).reshape(1, -1)
     similarity = cosine_similarity(persona_mean, all_tfidf)[0]
@@ -87,29 +92,41 @@ def content_based_filtering(events, guest_id, personas, bookings, n=config.DEFAU
     top_indices = top_indices[::-1]
     return events_shuffled.iloc[top_indices]
 
-def recommend_events(guest_id, n=config.DEFAULT_RECOMMENDATIONS, start_date=None, end_date=None):
-    bookings, events, _ = load_data()
-    personas = create_personas(bookings)
+def recommend_events(guest_id, n=config.DEFAULT_RECOMMENDATIONS, start_date=None, end_date=None, ranker=None, bookings=None, personas=None):
+    if bookings is None:
+        with span('recommend_events.load_bookings'):
+            bookings = load_dataset('bookings', config.BOOKINGS_ANALYTICS_COLUMNS, compact=True)
+    if personas is None:
+        with span('recommend_events.personas'):
+            personas = guest_personas(bookings)
     
-    events = events.copy()
-    events['date'] = pd.to_datetime(events['date'])
     if start_date is None:
-        tomorrow = (datetime.now() + timedelta(days=1)).date()
-        end_date_default = tomorrow + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
-        events = events[(events['date'].dt.date >= tomorrow) & (events['date'].dt.date <= end_date_default)]
-    else:
-        if end_date is None:
-            end_date = start_date + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
-        events = events[(events['date'].dt.date >= start_date) & (events['date'].dt.date <= end_date)]
-    
-    collab_recs = collaborative_filtering(events.copy(), guest_id, bookings, n)
-    content_recs = content_based_filtering(events.copy(), guest_id, personas, bookings, n)
+        start_date = (datetime.now() + timedelta(days=1)).date()
+        end_date = start_date + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+    elif end_date is None:
+        end_date = start_date + timedelta(days=config.DEFAULT_RECOMMENDATION_DAYS)
+    with span('recommend_events.load_events'):
+        events = load_window('events', start_date, end_date)
+    
+    with span('recommend_events.collaborative_filtering'):
+        collab_recs = collaborative_filtering(events.copy(), guest_id, bookings, n)
+    with span('recommend_events.content_based_filtering'):
+        content_recs = content_based_filtering(events.copy(), guest_id, personas, bookings, n)
     
     if len(collab_recs) > 0 and len(content_recs) > 0:
-        result = pd.concat([collab_recs, content_recs]).drop_duplicates(subset=['name']).head(n)
+        with span('recommend_events.concat'):
+            result = pd.concat([collab_recs, content_recs]).drop_duplicates(subset=['name'])
     elif len(collab_recs) > 0:
-        result = collab_recs.head(n)
+        result = collab_recs
     else:
-        result = content_recs.head(n)
+        result = content_recs
+    
+    if len(result) == 0:
+        return result
+    
+    if ranker is not None:
+        with span('recommend_events.rerank'):
+            result = ranker.rerank(guest_id, result)
+    result = result.head(n)
     
     return result.sort_values('date')
\ No newline at end of file
@@ -0,0 +1,225 @@
+import asyncio
+import argparse
+import json
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from ingest import SCHEMAS, load_dataset
+from incremental import aggregates_are_current, append_dataset, booking_totals, build_aggregates, current_table, merge_delta, table_features, write_table
+from preprocess import DAILY_COLUMNS
+from personas import cluster_guests
+import config
+
+FEATURES = ['age', 'average_daily_rate', 'rooms_booked']
+REQUIRED_FIELDS = [
+    'id', 'accommodation_id', 'accommodation_units', 'guest_id', 'age', 'country_id', 'date', 'rooms_booked',
+    'average_daily_rate', 'revenue_available_room', 'arrival_date', 'departure_date'
+]
+
+async def ndjson_source(path, from_start=False, poll_interval=config.STREAM_POLL_SECONDS):
+    while not os.path.exists(path):
+        await asyncio.sleep(poll_interval)
+    
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+        buffer = ''
+        while True:
+            line = f.readline()
+            if not line:
+                await asyncio.sleep(poll_interval)
+                continue
+            buffer += line
+            if not buffer.endswith('\n'):
+                continue
+            if buffer.strip():
+                yield buffer
+            buffer = ''
+
+def parse_record(item):
+    record = json.loads(item) if isinstance(item, str) else item
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+    
+    row = {}
+    for column, dtype in SCHEMAS['bookings'].items():
+        value = record.get(column)
+        if value is None or value == '':
+            if column in REQUIRED_FIELDS:
+                raise ValueError(f"missing {column}")
+            row[column] = None
+        elif dtype.startswith('datetime'):
+            row[column] = pd.Timestamp(value)
+        elif dtype == 'int64':
+            row[column] = int(value)
+        else:
+            row[column] = str(value)
+    
+    emitted_at = record.get('emitted_at')
+    if emitted_at is not None:
+        emitted_at = float(emitted_at)
+        if not math.isfinite(emitted_at):
+            raise ValueError(f"emitted_at is not a finite epoch timestamp: {record['emitted_at']!r}")
+    return emitted_at, row
+
+async def queue_source(queue):
+    while True:
+        yield await queue.get()
+
+def guest_totals(bookings):
+    return bookings.groupby('guest_id').agg(
+        age=('age', 'first'),
+        rate_sum=('average_daily_rate', 'sum'),
+        rate_count=('average_daily_rate', 'count'),
+        rooms_booked=('rooms_booked', 'sum'),
+        country_id=('country_id', 'first')
+    )
+
+class GuestIndex:
+    def __init__(self, bookings):
+        self.guests = guest_totals(bookings)
+        personas = cluster_guests(self.features().reset_index())
+        self.guests['persona_id'] = personas.set_index('guest_id')['persona_id']
+        
+        X = self.features()[FEATURES].fillna(0)
+        self.mean = X.mean().values
+        self.std = X.std(ddof=0).replace(0, 1).values
+        scaled = (X.values - self.mean) / self.std
+        self.centroids = pd.DataFrame(scaled).groupby(self.guests['persona_id'].values).mean().sort_index()
+    
+    def features(self, guests=None):
+        guests = self.guests if guests is None else guests
+        return pd.DataFrame({
+            'age': guests['age'],
+            'average_daily_rate': guests['rate_sum'] / guests['rate_count'],
+            'rooms_booked': guests['rooms_booked'],
+            'country_id': guests['country_id']
+        })
+    
+    def assign(self, guests):
+        scaled = (self.features(guests)[FEATURES].fillna(0).values - self.mean) / self.std
+        distances = ((scaled[:, None, :] - self.centroids.values[None, :, :]) ** 2).sum(axis=2)
+        return self.centroids.index.values[distances.argmin(axis=1)]
+    
+    def update(self, bookings):
+        totals = guest_totals(bookings)
+        existing = totals.index.intersection(self.guests.index)
+        new = totals.index.difference(self.guests.index)
+        
+        for column in ['rate_sum', 'rate_count', 'rooms_booked']:
+            self.guests.loc[existing, column] += totals.loc[existing, column]
+        if len(new) > 0:
+            self.guests = pd.concat([self.guests, totals.loc[new].assign(persona_id=0)])
+        
+        touched = totals.index
+        self.guests.loc[touched, 'persona_id'] = self.assign(self.guests.loc[touched])
+        return len(new)
+
+class BookingStreamIngestor:
+    def __init__(self, source, guest_index, batch_size=config.STREAM_BATCH_SIZE,
+                 batch_seconds=config.STREAM_BATCH_SECONDS, queue_size=config.STREAM_QUEUE_SIZE, on_batch=None):
+        self.source = source
+        self.guest_index = guest_index
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.on_batch = on_batch
+        self.table = current_table()
+        self.daily = table_features(self.table)
+        self.records = 0
+        self.rejected = 0
+        self.batches = 0
+        self.new_guests = 0
+        self.lag_sum = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+    
+    async def produce(self):
+        async for item in self.source:
+            try:
+                emitted_at, record = parse_record(item)
+            except (ValueError, TypeError, OverflowError) as e:
+                self.rejected += 1
+                print(f"Skipped booking record ({e}): {str(item).strip()[:200]}")
+                continue
+            await self.queue.put((time.time() if emitted_at is None else emitted_at, record))
+    
+    async def next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_seconds
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    def apply_rows(self, rows):
+        rows = append_dataset('bookings', rows)
+        self.table = merge_delta(self.table, booking_totals(rows), DAILY_COLUMNS)
+        write_table(self.table)
+        self.new_guests += self.guest_index.update(rows)
+        self.daily = table_features(self.table)
+    
+    async def consume(self):
+        while True:
+            batch = await self.next_batch()
+            rows = pd.DataFrame([record for _, record in batch])
+            await asyncio.to_thread(self.apply_rows, rows)
+            try:
+                self.record_batch(batch)
+            except Exception as e:
+                print(f"Failed to record stats for a batch of {len(batch)} bookings: {e!r}")
+    
+    def record_batch(self, batch):
+        now = time.time()
+        lags = np.array([now - received for received, _ in batch])
+        self.records += len(batch)
+        self.batches += 1
+        self.lag_sum += float(lags.sum())
+        self.last_lag = float(lags.max())
+        self.max_lag = max(self.max_lag, self.last_lag)
+        if self.on_batch is not None:
+            self.on_batch(self)
+    
+    async def run(self):
+        await asyncio.gather(self.produce(), self.consume())
+    
+    def stats(self):
+        return {
+            'records': self.records,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'new_guests': self.new_guests,
+            'queue_depth': self.queue.qsize(),
+            'last_lag_seconds': self.last_lag,
+            'mean_lag_seconds': self.lag_sum / self.records if self.records else 0.0,
+            'max_lag_seconds': self.max_lag
+        }
+
+async def report(ingestor, interval=config.STREAM_REPORT_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        print(ingestor.stats())
+
+async def run_ndjson(path, from_start=False):
+    if not aggregates_are_current():
+        build_aggregates()
+    guest_index = GuestIndex(load_dataset('bookings', config.BOOKINGS_ANALYTICS_COLUMNS))
+    ingestor = BookingStreamIngestor(ndjson_source(path, from_start), guest_index)
+    await asyncio.gather(ingestor.run(), report(ingestor))
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest a stream of booking records from a tailed NDJSON file')
+    parser.add_argument('path', help='NDJSON file with one booking record per line')
+    parser.add_argument('--from-start', action='store_true', help='Read existing lines before tailing')
+    args = parser.parse_args()
+    asyncio.run(run_ndjson(args.path, args.from_start))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import shutil
+import sys
+import numpy as np
+import pytest
+
+MLST_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MLST_PATH)
+sys.path.insert(0, os.path.join(MLST_PATH, 'dataset_generators'))
+import config
+
+SCALE = 0.5
+SPAN = 0.15
+
+@pytest.fixture(scope='session')
+def generated_datasets(tmp_path_factory):
+    from generate_weather import generate_weather
+    from generate_events import generate_events
+    from generate_bookings import generate_accommodations, generate_bookings
+    from generate_web_analytics import generate_web_analytics
+    
+    path = str(tmp_path_factory.mktemp('generated'))
+    previous = config.DATASETS_PATH
+    config.DATASETS_PATH = path
+    try:
+        weather_seed, events_seed, accommodations_seed, bookings_seed, web_seed = np.random.SeedSequence(config.RANDOM_STATE).spawn(5)
+        generate_weather(weather_seed, SPAN, 'csv')
+        generate_events(events_seed, SCALE, SPAN, 'csv')
+        accommodations = generate_accommodations(seed=accommodations_seed, scale=SCALE)
+        generate_bookings(accommodations, bookings_seed, scale=SCALE, span=SPAN, fmt='csv')
+        generate_web_analytics(web_seed)
+    finally:
+        config.DATASETS_PATH = previous
+    return path
+
+@pytest.fixture
+def datasets(generated_datasets, tmp_path, monkeypatch):
+    path = str(tmp_path / 'datasets')
+    shutil.copytree(generated_datasets, path)
+    monkeypatch.setattr(config, 'DATASETS_PATH', path)
+    return path
+
+@pytest.fixture(params=['csv', 'parquet'])
+def dataset_format(request, datasets):
+    if request.param == 'parquet':
+        from ingest import SCHEMAS, build_columnar, csv_path
+        build_columnar()
+        for name in SCHEMAS:
+            os.remove(csv_path(name))
+    return request.param
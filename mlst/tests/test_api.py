@@ -0,0 +1,78 @@
+import importlib
+import shutil
+import pytest
+from fastapi.testclient import TestClient
+import config
+
+@pytest.fixture(scope='module')
+def api_datasets(generated_datasets, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('api') / 'datasets')
+    shutil.copytree(generated_datasets, path)
+    return path
+
+@pytest.fixture
+def client(api_datasets, monkeypatch):
+    monkeypatch.setattr(config, 'DATASETS_PATH', api_datasets)
+    api = importlib.import_module('api')
+    return TestClient(api.app)
+
+def test_versioned_response_revalidates_with_etag(client):
+    response = client.get('/eda/daily')
+    etag = response.headers['etag']
+    assert response.status_code == 200 and len(response.json()) > 0
+    
+    not_modified = client.get('/eda/daily', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+    assert not_modified.headers['etag'] == etag
+    
+    assert client.get('/eda/daily', headers={'If-None-Match': f'"other", {etag}'}).status_code == 304
+    assert client.get('/eda/daily', headers={'If-None-Match': '*'}).status_code == 304
+    assert client.get('/eda/daily', headers={'If-None-Match': '"other"'}).status_code == 200
+
+def test_etag_depends_on_endpoint_and_parameters(client):
+    by_type = client.get('/eda/segments', params={'by': 'type'})
+    by_stars = client.get('/eda/segments', params={'by': 'stars'})
+    assert by_type.status_code == by_stars.status_code == 200
+    assert by_type.headers['etag'] != by_stars.headers['etag']
+    assert by_type.headers['etag'] != client.get('/eda/monthly').headers['etag']
+    assert client.get('/eda/segments', params={'by': 'stars'}, headers={'If-None-Match': by_type.headers['etag']}).status_code == 200
+
+def test_etag_changes_with_dataset_version(client, monkeypatch):
+    import api
+    etag = client.get('/eda/daily').headers['etag']
+    monkeypatch.setitem(api.state, 'version', 'changed')
+    
+    response = client.get('/eda/daily', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+
+@pytest.mark.parametrize('path, params', [
+    ('/occupancy', {'start_date': 'not-a-date', 'end_date': '2024-01-01'}),
+    ('/occupancy', {'start_date': '2024-01-01'}),
+    ('/eda/segments', {'start_date': '2024-13-01'}),
+    ('/eda/segments', {'by': 'guest_id'}),
+    ('/recommend/1', {'start_date': 'tomorrow'}),
+])
+def test_invalid_query_parameters_are_rejected(client, path, params):
+    assert client.get(path, params=params).status_code == 422
+
+def test_invalid_impressions_are_rejected(client):
+    import api
+    before = api.state['ranker'].n_impressions
+    impression = {'guest_id': 1, 'event_id': 1, 'date_shown': '2024-01-01', 'clicked': 1}
+    
+    assert client.post('/impressions', json=[dict(impression, date_shown='yesterday')]).status_code == 422
+    assert client.post('/impressions', json=[dict(impression, clicked='yes')]).status_code == 422
+    assert api.state['ranker'].n_impressions == before
+    
+    response = client.post('/impressions', json=[impression])
+    assert response.status_code == 200
+    assert response.json()['total_impressions'] == before + 1
+
+def test_occupancy_filters_by_date(client):
+    import api
+    calendar = api.state['occupancy']
+    day = calendar['date'].min()
+    rows = client.get('/occupancy', params={'start_date': day.date().isoformat(), 'end_date': day.date().isoformat()}).json()
+    assert len(rows) == (calendar['date'] == day).sum() > 0
@@ -0,0 +1,37 @@
+import pytest
+import incremental
+from artifacts import artifact_key, manifest_entry, update_manifest
+from ingest import load_dataset
+import config
+
+def test_artifact_key_depends_on_build_settings(datasets, monkeypatch):
+    manifest = update_manifest()
+    personas = artifact_key('personas', manifest)
+    ranker = artifact_key('ranker', manifest)
+    daily = artifact_key('daily', manifest)
+    
+    monkeypatch.setattr(config, 'PERSONAS_CLUSTERS', config.PERSONAS_CLUSTERS + 1)
+    assert artifact_key('personas', manifest) != personas
+    assert artifact_key('ranker', manifest) != ranker
+    assert artifact_key('daily', manifest) == daily
+
+def test_artifact_key_depends_on_input_files(datasets):
+    manifest = update_manifest()
+    keys = {name: artifact_key(name, manifest) for name in ['daily', 'personas', 'ranker']}
+    
+    with open(f'{config.DATASETS_PATH}/web_analytics.csv', 'a') as f:
+        f.write('\n')
+    changed = update_manifest()
+    assert artifact_key('ranker', changed) != keys['ranker']
+    assert artifact_key('daily', changed) == keys['daily']
+    assert artifact_key('personas', changed) == keys['personas']
+
+@pytest.mark.parametrize('dataset_format', ['parquet'], indirect=True)
+def test_parquet_delta_files_change_the_manifest_entry(dataset_format):
+    entry = manifest_entry(update_manifest(), 'bookings.csv')
+    assert entry
+    
+    incremental.append_rows('bookings', load_dataset('bookings').tail(3))
+    manifest = update_manifest()
+    assert manifest_entry(manifest, 'bookings.csv')['sha256'] != entry['sha256']
+    assert manifest_entry(manifest, 'events.csv') == manifest['events.parquet']
@@ -0,0 +1,22 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+import duckdb_backend
+from ingest import load_data, load_dataset
+from preprocess import preprocess, preprocess_chunked
+from personas import create_personas
+import config
+
+def test_daily_features_match_across_backends(dataset_format):
+    bookings, events, weather = load_data(config.BOOKINGS_ANALYTICS_COLUMNS, weather_columns=config.WEATHER_ANALYTICS_COLUMNS)
+    expected = preprocess(bookings, events, weather)
+    
+    assert len(expected) > 0
+    assert_frame_equal(preprocess_chunked(chunksize=500), expected, check_dtype=False)
+    assert_frame_equal(duckdb_backend.preprocess(), expected, check_dtype=False)
+
+def test_personas_match_across_backends(dataset_format):
+    expected = create_personas(load_dataset('bookings', config.BOOKINGS_ANALYTICS_COLUMNS))
+    personas = duckdb_backend.create_personas()
+    
+    assert expected['persona_id'].nunique() == config.PERSONAS_CLUSTERS
+    assert_frame_equal(personas.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
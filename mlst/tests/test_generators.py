@@ -0,0 +1,21 @@
+import numpy as np
+from pandas.testing import assert_frame_equal
+from generate_bookings import generate_accommodations, generate_bookings
+from ingest import load_dataset
+import config
+
+def generate(workers, fmt='csv'):
+    accommodations_seed, bookings_seed = np.random.SeedSequence(config.RANDOM_STATE).spawn(2)
+    accommodations = generate_accommodations(seed=accommodations_seed, scale=0.2)
+    generate_bookings(accommodations, bookings_seed, workers=workers, scale=0.2, span=0.1, fmt=fmt)
+    return load_dataset('bookings')
+
+def test_bookings_depend_on_seed_not_workers(datasets):
+    assert_frame_equal(generate(workers=1), generate(workers=2))
+
+def test_csv_and_parquet_outputs_match(datasets):
+    from_csv = generate(workers=1, fmt='csv')
+    from_parquet = generate(workers=1, fmt='parquet')
+    
+    assert len(from_csv) > 0
+    assert_frame_equal(from_parquet, from_csv, check_dtype=False)
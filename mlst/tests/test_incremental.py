@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+import pyarrow.parquet as pq
+from pandas.testing import assert_frame_equal
+import incremental
+from ingest import columnar_path, csv_path, delta_files, load_dataset
+import config
+
+def split_bookings(dataset_format):
+    bookings = load_dataset('bookings')
+    dates = bookings['date'].sort_values().unique()
+    cutoff = dates[len(dates) * 2 // 3]
+    # The appended rows overlap dates already in the table as well as add new ones.
+    history = bookings[(bookings['date'] < cutoff) | (bookings.index % 2 == 0)]
+    new_rows = bookings.drop(history.index)
+    if dataset_format == 'csv':
+        pd.read_csv(csv_path('bookings')).loc[history.index].to_csv(csv_path('bookings'), index=False)
+    else:
+        history.to_parquet(columnar_path('bookings'), index=False)
+    return new_rows
+
+def rebuilt_table():
+    table = incremental.read_table()
+    return table, incremental.build_aggregates()
+
+def test_append_matches_full_rebuild(dataset_format):
+    new_rows = split_bookings(dataset_format)
+    incremental.build_aggregates()
+    
+    for _, batch in new_rows.groupby(new_rows.index // 200):
+        incremental.append_rows('bookings', batch)
+    
+    appended, rebuilt = rebuilt_table()
+    assert len(rebuilt) > 0
+    assert_frame_equal(appended.sort_values('date').reset_index(drop=True), rebuilt.sort_values('date').reset_index(drop=True), check_dtype=False)
+    assert_frame_equal(incremental.table_features(appended), incremental.table_features(rebuilt), check_dtype=False)
+
+def test_first_append_builds_the_full_table(datasets):
+    new_rows = split_bookings('csv')
+    incremental.append_rows('bookings', new_rows)
+    
+    appended, rebuilt = rebuilt_table()
+    assert_frame_equal(appended, rebuilt, check_dtype=False)
+
+@pytest.mark.parametrize('dataset_format', ['parquet'], indirect=True)
+def test_parquet_appends_write_delta_files_and_compact(dataset_format, monkeypatch):
+    monkeypatch.setattr(config, 'COLUMNAR_MAX_DELTA_FILES', 3)
+    new_rows = split_bookings(dataset_format)
+    base_rows = pq.ParquetFile(columnar_path('bookings')).metadata.num_rows
+    batches = [batch for _, batch in new_rows.groupby(new_rows.index % 3)]
+    
+    incremental.append_rows('bookings', batches[0])
+    incremental.append_rows('bookings', batches[1])
+    assert len(delta_files('bookings')) == 2
+    assert pq.ParquetFile(columnar_path('bookings')).metadata.num_rows == base_rows
+    assert len(load_dataset('bookings')) == base_rows + len(batches[0]) + len(batches[1])
+    
+    incremental.append_rows('bookings', batches[2])
+    assert delta_files('bookings') == []
+    assert pq.ParquetFile(columnar_path('bookings')).metadata.num_rows == base_rows + len(new_rows)
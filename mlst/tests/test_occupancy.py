@@ -0,0 +1,39 @@
+from collections import Counter
+import pandas as pd
+from ingest import load_dataset
+from occupancy import daily_occupancy, occupancy_calendar, occupancy_matrix
+import config
+
+def brute_force_counts(bookings):
+    counts = Counter()
+    for booking in bookings.itertuples():
+        if pd.notna(booking.deleted_at):
+            continue
+        for night in pd.date_range(booking.arrival_date, booking.departure_date, inclusive='left'):
+            counts[night, booking.accommodation_id] += booking.rooms_booked
+    return counts
+
+def test_occupancy_matrix_matches_brute_force(datasets):
+    bookings = load_dataset('bookings', config.OCCUPANCY_COLUMNS)
+    expected = brute_force_counts(bookings)
+    matrix = occupancy_matrix(bookings)
+    
+    assert sum(expected.values()) > 0
+    assert matrix.values.sum() == sum(expected.values())
+    occupied = matrix.stack()
+    assert {key: rooms for key, rooms in occupied.items() if rooms} == dict(expected)
+
+def test_calendar_and_daily_totals_agree(datasets):
+    bookings = load_dataset('bookings', config.OCCUPANCY_COLUMNS)
+    calendar = occupancy_calendar(bookings)
+    daily = daily_occupancy(bookings)
+    
+    totals = calendar.groupby('date')['rooms_occupied'].sum()
+    assert (totals.values == daily.set_index('date')['occupancy'].reindex(totals.index).values).all()
+
+def test_cancelled_and_empty_bookings(datasets):
+    bookings = load_dataset('bookings', config.OCCUPANCY_COLUMNS)
+    cancelled = bookings.assign(deleted_at=pd.Timestamp('2026-01-01'))
+    
+    assert occupancy_matrix(cancelled).size == 0
+    assert len(occupancy_calendar(bookings.head(0))) == 0